@@ -13,12 +13,19 @@ import io
 import base64
 # Import services and utilities
 from services.openrouter_service import translate_text
-from services.html_extract_service import extract_text_from_url
+from services.url_content_service import get_url_content
+from services.catalog_crawler import start_background_prewarm
 from services.qa_service import QAEngine
-from utils.pdf_utils import extract_text_from_pdf, create_summary_pdf
-from utils.text_chunker import chunk_text_simple
+from utils.pdf_utils import extract_text_from_pdf, iter_pdf_pages, pdf_page_count, pdf_text_prefix, create_summary_pdf
+from utils.pdf_store import touch
+from utils.text_chunker import chunk_text_simple, chunk_text_stream, estimate_chunk_count
 from utils.highlight import highlight_keywords
-from utils.db_cache import get_url_cache, init_db, compute_source_key, get_cached_summary, save_to_cache, clear_old_cache, save_url_cache
+from utils.db_cache import init_db, compute_source_key, get_cached_summary, save_to_cache, update_cached_pdf_path, get_cache_stats, search_cache
+from utils.cache_metrics import latency_quantile
+from utils.maintenance import start_background_maintenance
+from utils.cache_snapshot import CACHE_SNAPSHOT, import_snapshots
+from services.pdf_server import shared_pdf_url, routes_mounted
+from services.metrics_server import is_authorized
 from utils.logger import logger
 from data.schemes import SCHEMES
 from gtts import gTTS
@@ -28,6 +35,8 @@ load_dotenv()
 SHARED_DIR = os.getenv("SHARED_DIR", "shared")
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8501")
 
+PDF_READ_ERROR = "Error: Could not read the PDF file. It might be corrupted or password-protected."
+
 # --- Initialize Session State ---
 def initialize_session_state():
     if 'processed' not in st.session_state:
@@ -79,6 +88,15 @@ def reset_session():
     st.session_state.source_type = ""
     st.rerun()
 
+def count_pages(pages, progress: dict):
+    """Passes pages through, counting them in progress["pages"]; a read error ends the pages and is kept in progress["error"]."""
+    try:
+        for page in pages:
+            progress["pages"] += 1
+            yield page
+    except Exception as e:
+        progress["error"] = e
+
 def get_image_base64(img_path):
     """Convert image to base64 for embedding in HTML."""
     try:
@@ -155,15 +173,86 @@ def create_category_count_chart():
     )
     return fig
 
+@st.cache_resource
+def init_storage():
+    """
+    Creates the cache schema, imports any cache snapshots (CACHE_SNAPSHOT) not applied
+    yet and starts periodic cache/PDF expiry, once per server process.
+    """
+    if CACHE_SNAPSHOT:
+        import_snapshots(CACHE_SNAPSHOT, SHARED_DIR)
+    init_db()
+    return start_background_maintenance(SHARED_DIR)
+
+@st.cache_resource
+def start_catalog_prewarm():
+    """Starts the catalog pre-warm crawler once per server process."""
+    return start_background_prewarm()
+
+def load_cached_summary(source_key: str) -> bool:
+    """Shows a cached summary as the current result; returns False if there is none."""
+    cached_result = get_cached_summary(source_key)
+    if not cached_result:
+        return False
+    st.session_state.summary_en = cached_result['summary_en']
+    st.session_state.summary_te = cached_result['summary_te']
+    st.session_state.pdf_path = cached_result['pdf_path']
+    if st.session_state.pdf_path and os.path.exists(st.session_state.pdf_path):
+        touch(st.session_state.pdf_path)
+    else:
+        # The PDF was garbage-collected; render it again from the cached summaries
+        st.session_state.pdf_path = create_summary_pdf(st.session_state.summary_en, st.session_state.summary_te, SHARED_DIR)
+        if st.session_state.pdf_path:
+            update_cached_pdf_path(source_key, st.session_state.pdf_path)
+    st.session_state.processed = True
+    return True
+
+def render_cache_admin():
+    """Admin page (?page=cache&token=CACHE_ADMIN_TOKEN): hit rates, sizes and lookup latency of every cache in this server process."""
+    st.title("📊 Cache Statistics")
+    st.caption("Counters cover this server process since it started; row counts and sizes are refreshed every CACHE_STATS_TTL_SECONDS. "
+               "Machine-readable: /metrics (Prometheus) and /metrics.json, with the same token.")
+    stats = get_cache_stats()
+
+    rows = []
+    for cache, s in stats.items():
+        memory = s["memory"] or {}
+        p50, p95 = latency_quantile(s["latency"], 0.5), latency_quantile(s["latency"], 0.95)
+        rows.append({
+            "Cache": cache,
+            "Hit rate": f"{s['hit_rate']:.1%}" if s["hit_rate"] is not None else "-",
+            "Hits": s["hits"],
+            "Misses": s["misses"],
+            "p50 ≤ ms": p50 * 1000 if p50 is not None else None,
+            "p95 ≤ ms": p95 * 1000 if p95 is not None else None,
+            "Rows": s["entries"],
+            "Stored KiB": round(s["bytes"] / 1024, 1),
+            "Expired": s["expired"],
+            "Memory entries": memory.get("entries"),
+            "Memory KiB": round(memory["bytes"] / 1024, 1) if memory else None,
+            "Memory evictions": memory.get("evictions"),
+        })
+    st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+    st.subheader("Lookup latency")
+    histogram = pd.DataFrame([
+        {"Cache": cache, "≤ ms": str(bound if bound == "+Inf" else bound * 1000), "Lookups": count}
+        for cache, s in stats.items() for bound, count in s["latency"]["buckets"].items()
+    ])
+    st.plotly_chart(px.bar(histogram, x="≤ ms", y="Lookups", color="Cache", barmode="group"), use_container_width=True)
+
 # --- Main Application ---
 def main():
-    # Initialize database and logger
-    init_db()
-    clear_old_cache(days_old=7) # Clean up old cache entries on startup
+    init_storage()
+    if os.getenv("PREWARM_CATALOG", "False").lower() == "true":
+        start_catalog_prewarm()
     initialize_session_state()
 
     # --- UI Layout ---
     st.set_page_config(page_title="AI-Sahayak", layout="wide", initial_sidebar_state="expanded")
+    if st.query_params.get("page") == "cache" and is_authorized(st.query_params.get("token")):
+        render_cache_admin()
+        return
     
     # Custom CSS for better UI
     st.markdown("""
@@ -696,17 +785,20 @@ def main():
             st.markdown('</div>', unsafe_allow_html=True)
             
             # Conditional Input Widgets
+            # An uploaded PDF is not extracted here: its pages are streamed when the summary is generated
+            uploaded_file = None
             if input_method == "Upload PDF":
                 st.markdown('<div class="card">', unsafe_allow_html=True)
                 uploaded_file = st.file_uploader("Choose a PDF file", type="pdf")
+                st.session_state.extracted_text = ""
                 if uploaded_file:
-                    temp_extracted_text = extract_text_from_pdf(uploaded_file)
-                    if not temp_extracted_text.startswith("Error:"):
-                        st.session_state.extracted_text = temp_extracted_text
+                    try:
+                        st.caption(f"{pdf_page_count(uploaded_file)} pages")
                         st.session_state.source_type = "pdf"
-                    else:
-                        st.markdown(f'<div class="error-message">{temp_extracted_text}</div>', unsafe_allow_html=True)
-                        st.session_state.extracted_text = ""
+                    except Exception as e:
+                        logger.error(f"Error reading PDF file: {e}")
+                        st.markdown(f'<div class="error-message">{PDF_READ_ERROR}</div>', unsafe_allow_html=True)
+                        uploaded_file = None
                 st.markdown('</div>', unsafe_allow_html=True)
             
             elif input_method == "Paste Text":
@@ -722,20 +814,20 @@ def main():
                 url_input = st.text_input("Enter the public URL of the scheme document:")
                 if url_input:
                     with st.spinner("Fetching content..."):
-                        # Check if we have cached content first
-                        cached_content = get_url_cache(url_input)
-                        if cached_content:
-                            st.session_state.extracted_text = cached_content
+                        # Cached content is served directly (stale entries refresh in the background) or
+                        # revalidated once past their hard TTL; misses are extracted and cached
+                        url_result = get_url_content(url_input)
+                        if url_result["source"] in ("cache", "stale", "revalidated"):
+                            st.session_state.extracted_text = url_result["text"]
                             st.info("📋 Using cached content from previous extraction (faster loading)")
+                        elif url_result["source"] == "extracted":
+                            st.session_state.extracted_text = url_result["text"]
+                            st.success("✅ Content extracted and cached for future use")
+                        elif url_result["source"] == "unavailable":
+                            # Recent failures for this site: report it now instead of retrying every strategy
+                            st.session_state.extracted_text = url_result["text"]
                         else:
-                            temp_extracted_text = extract_text_from_url(url_input)
-                            if temp_extracted_text and not temp_extracted_text.startswith("Error:"):
-                                # Cache the successful extraction for future use
-                                save_url_cache(url_input, temp_extracted_text)
-                                st.session_state.extracted_text = temp_extracted_text
-                                st.success("✅ Content extracted and cached for future use")
-                            else:
-                                st.session_state.extracted_text = ""
+                            st.session_state.extracted_text = ""
                         
                         st.session_state.source_type = "url"
                         if st.session_state.extracted_text.startswith("Error:") or not st.session_state.extracted_text:
@@ -761,7 +853,7 @@ def main():
                 st.markdown('</div>', unsafe_allow_html=True)
             
             # Generate Summary Section - This appears after any content is extracted
-            if st.session_state.extracted_text and not st.session_state.processed:
+            if (uploaded_file or st.session_state.extracted_text) and not st.session_state.processed:
                 st.markdown('<div class="card">', unsafe_allow_html=True)
                 st.markdown('<h2 class="section-header">🚀 Generate Summary</h2>', unsafe_allow_html=True)
                 
@@ -774,36 +866,57 @@ def main():
                 # Main Processing Button
                 st.markdown('<div style="text-align: center; margin-top: 2rem;">', unsafe_allow_html=True)
                 if st.button("🚀 Generate Summary", type="primary"):
-                    if not st.session_state.extracted_text:
+                    if not (uploaded_file or st.session_state.extracted_text):
                         st.markdown('<div class="warning-message">Please provide scheme content using one of the methods above.</div>', unsafe_allow_html=True)
                     else:
                         keywords = [k.strip() for k in keywords_input.split(',') if k.strip()]
                         st.session_state.keywords = keywords_input  # Store keywords in session state
-                        source_key = compute_source_key(st.session_state.source_type, st.session_state.extracted_text[:10000])
+                        try:
+                            # For a PDF only the pages spanning the first 10,000 characters are read here
+                            key_text = pdf_text_prefix(uploaded_file, 10000) if uploaded_file else st.session_state.extracted_text[:10000]
+                        except Exception as e:
+                            logger.error(f"Error reading PDF file: {e}")
+                            st.markdown(f'<div class="error-message">{PDF_READ_ERROR}</div>', unsafe_allow_html=True)
+                            st.stop()
+                        source_key = compute_source_key(st.session_state.source_type, key_text)
                         
                         # Check Cache
-                        cached_result = get_cached_summary(source_key)
-                        if cached_result:
+                        if load_cached_summary(source_key):
                             st.markdown('<div class="success-message">Found a cached summary!</div>', unsafe_allow_html=True)
-                            st.session_state.summary_en = cached_result['summary_en']
-                            st.session_state.summary_te = cached_result['summary_te']
-                            st.session_state.pdf_path = cached_result['pdf_path']
-                            st.session_state.processed = True
                             st.rerun()
                         else:
                             with st.spinner("AI is processing the document... This may take a moment."):
                                 # 1. Summarize Chunks (First Pass)
-                                chunks = chunk_text_simple(st.session_state.extracted_text)
-                                chunk_summaries = []
+                                # Chunks are produced lazily; an uploaded PDF is streamed page by page,
+                                # so summarizing starts on the first pages and progress follows the pages read
                                 progress_bar = st.progress(0, text="Starting summarization...")
+                                chunk_summaries = []
+                                progress = {"pages": 0}
+                                if uploaded_file:
+                                    page_count = pdf_page_count(uploaded_file)
+                                    chunks = chunk_text_stream(count_pages(iter_pdf_pages(uploaded_file), progress))
+                                else:
+                                    chunk_count = estimate_chunk_count(len(st.session_state.extracted_text))
+                                    chunks = chunk_text_stream([st.session_state.extracted_text])
                                 for i, chunk in enumerate(chunks):
-                                    progress_bar.progress((i + 1) / len(chunks), text=f"Summarizing chunk {i+1}/{len(chunks)}...")
+                                    if "error" in progress:
+                                        break
+                                    if uploaded_file:
+                                        progress_bar.progress(min(progress["pages"] / page_count, 1.0),
+                                                              text=f"Summarizing chunk {i+1} (page {progress['pages']}/{page_count})...")
+                                    else:
+                                        progress_bar.progress(min((i + 1) / chunk_count, 1.0), text=f"Summarizing chunk {i+1}/{chunk_count}...")
                                     from services.openrouter_service import summarize_chunk
                                     summary = summarize_chunk(chunk)
                                     if not summary.startswith("Error:"):
                                         chunk_summaries.append(summary)
                                 progress_bar.empty()
                                 
+                                if "error" in progress:
+                                    logger.error(f"Error reading PDF file: {progress['error']}")
+                                    st.markdown(f'<div class="error-message">{PDF_READ_ERROR}</div>', unsafe_allow_html=True)
+                                    st.stop()
+                                
                                 if not chunk_summaries:
                                     st.markdown('<div class="error-message">Failed to summarize any part of the document.</div>', unsafe_allow_html=True)
                                     st.stop()
@@ -870,7 +983,9 @@ def main():
                                 
                                 # Initialize Q&A engine with the full document
                                 with st.spinner("Preparing Q&A system..."):
-                                    qa_success = st.session_state.qa_engine.process_document(st.session_state.extracted_text)
+                                    # The PDF's pages are all in the page cache by now, so this does not parse it again
+                                    document_text = extract_text_from_pdf(uploaded_file) if uploaded_file else st.session_state.extracted_text
+                                    qa_success = st.session_state.qa_engine.process_document(document_text)
                                     if not qa_success:
                                         st.warning("Q&A system could not be initialized. You can still view the summary.")
                                 
@@ -919,6 +1034,18 @@ def main():
                         """, unsafe_allow_html=True)
                 else:
                     st.markdown(f'<p>No schemes found matching "{search_query}".</p>', unsafe_allow_html=True)
+                
+                # Documents analyzed before: opening one reuses its summary instead of running the AI again
+                past_results = search_cache(search_query)
+                if past_results:
+                    st.markdown('<h3 class="section-header">🗂️ Previously Analyzed</h3>', unsafe_allow_html=True)
+                    for i, result in enumerate(past_results):
+                        label = "Summary" if result["kind"] == "summary" else "Web page"
+                        st.markdown(f"**{result['title']}**  \n{label} · {str(result['timestamp'])[:10]}")
+                        st.caption(result["snippet"])
+                        if result["summary_key"] and st.button("Open summary", key=f"open_past_{i}"):
+                            if load_cached_summary(result["summary_key"]):
+                                st.rerun()
             
             st.markdown('</div>', unsafe_allow_html=True)
 
@@ -958,18 +1085,24 @@ def main():
         # PDF Download
         if st.session_state.pdf_path and os.path.exists(st.session_state.pdf_path):
             st.markdown('<h3 class="section-header">📥 Download Options</h3>', unsafe_allow_html=True)
-            with open(st.session_state.pdf_path, "rb") as f:
-                pdf_data = f.read()
-            st.download_button(
-                label="📥 Download Complete Summary PDF",
-                data=pdf_data,
-                file_name=os.path.basename(st.session_state.pdf_path),
-                mime="application/pdf"
-            )
+            if routes_mounted():
+                # Served over HTTP by the /shared route; nothing is sent over the websocket
+                pdf_name = os.path.basename(st.session_state.pdf_path)
+                st.markdown(f'<a href="{shared_pdf_url(st.session_state.pdf_path)}" download="{pdf_name}" class="download-button">📥 Download Complete Summary PDF</a>', unsafe_allow_html=True)
+            else:
+                # Started without server.py: fall back to sending the file through Streamlit
+                with open(st.session_state.pdf_path, "rb") as f:
+                    pdf_data = f.read()
+                st.download_button(
+                    label="📥 Download Complete Summary PDF",
+                    data=pdf_data,
+                    file_name=os.path.basename(st.session_state.pdf_path),
+                    mime="application/pdf"
+                )
             
             # Sharing - Fixed WhatsApp sharing
             st.markdown('<h3 class="section-header">📤 Share Summary</h3>', unsafe_allow_html=True)
-            public_pdf_url = f"{BASE_URL}/{st.session_state.pdf_path}"
+            public_pdf_url = shared_pdf_url(st.session_state.pdf_path, BASE_URL)
             
             # Create a properly formatted message
             summary_preview = st.session_state.summary_en[:200] + "..." if len(st.session_state.summary_en) > 200 else st.session_state.summary_en
@@ -0,0 +1,101 @@
+# benchmarks/bench_cache_backends.py
+"""
+Measures hit-path latency of a url_cache lookup in each cache tier:
+
+  memory  in-process LRU tier (get_url_cache_entry, entry in memory)
+  local   this replica's SQLite database (get_url_cache_entry, memory tier emptied)
+  sqlite  the shared tier as a SQLite file on the same host (SQLiteBackend.get)
+  http    the shared tier behind a local cache server (HttpBackend.get against services/cache_server.py)
+
+The shared tiers are timed at the backend call; a replica missing locally
+pays that plus copying the record into its own database.
+
+Everything runs on temporary databases; the tracked cache.db is never touched.
+
+Usage:
+    python -m benchmarks.bench_cache_backends [--rows 200] [--lookups 2000] [--content-kb 20]
+"""
+
+import argparse
+import logging
+import os
+import random
+import secrets
+import tempfile
+import threading
+import time
+
+import utils.db_cache as db_cache
+from services.cache_server import create_server
+from utils.cache_backends import HttpBackend, SQLiteBackend
+from utils.logger import logger
+
+def _quantiles(samples: list[float]) -> tuple[float, float, float]:
+    samples = sorted(samples)
+    pick = lambda q: samples[min(int(q * len(samples)), len(samples) - 1)] * 1e6
+    return pick(0.5), pick(0.95), sum(samples) / len(samples) * 1e6
+
+def _time_lookups(lookup, urls: list[str], lookups: int, before=None) -> list[float]:
+    rng = random.Random(0)
+    samples = []
+    for _ in range(lookups):
+        url = rng.choice(urls)
+        if before:
+            before(url)
+        start = time.perf_counter()
+        entry = lookup(url)
+        samples.append(time.perf_counter() - start)
+        assert entry, f"miss for {url}"
+    return samples
+
+def run(rows: int, lookups: int, content: str) -> dict:
+    """Returns {tier: latency samples in seconds} for `lookups` random hits over `rows` cached pages."""
+    results = {}
+    original_backend = db_cache._shared_backend
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_backend = SQLiteBackend(os.path.join(tmp, "shared.db"))
+        token = secrets.token_hex(16)
+        server = create_server("127.0.0.1", 0, os.path.join(tmp, "server.db"), token)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        http_backend = HttpBackend(f"http://127.0.0.1:{server.server_address[1]}", timeout=5, token=token)
+        try:
+            db_cache._shared_backend = None
+            db_cache.DB_NAME = os.path.join(tmp, "replica.db")
+            db_cache.init_db()
+            urls = [f"https://scheme.example.gov.in/page/{i}" for i in range(rows)]
+            for url in urls:
+                db_cache.save_url_cache(url, content)
+                values, fmt = db_cache._url_memory.get(url)
+                record = {**values, "payload_format": fmt}
+                sqlite_backend.put("url", url, record)
+                http_backend.put("url", url, record)
+
+            results["memory"] = _time_lookups(db_cache.get_url_cache_entry, urls, lookups)
+            results["local"] = _time_lookups(db_cache.get_url_cache_entry, urls, lookups,
+                                             before=lambda url: db_cache._url_memory.pop(url))
+            results["sqlite"] = _time_lookups(lambda url: sqlite_backend.get("url", url), urls, lookups)
+            results["http"] = _time_lookups(lambda url: http_backend.get("url", url), urls, lookups)
+        finally:
+            server.shutdown()
+            server.server_close()
+            db_cache.close_db_connection()
+            db_cache._shared_backend = original_backend
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cache hit latency per tier and shared backend.")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--content-kb", type=int, default=20, help="Size of each cached page")
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    content = ("Eligibility, benefits and how to apply. " * (args.content_kb * 1024 // 40 + 1))[:args.content_kb * 1024]
+    print(f"{args.rows} cached pages of {args.content_kb} KiB, {args.lookups} lookups per tier\n")
+    print(f"{'TIER':<7} {'P50 µs':>9} {'P95 µs':>9} {'MEAN µs':>9}")
+    for tier, samples in run(args.rows, args.lookups, content).items():
+        p50, p95, mean = _quantiles(samples)
+        print(f"{tier:<7} {p50:>9.1f} {p95:>9.1f} {mean:>9.1f}")
+
+if __name__ == "__main__":
+    main()
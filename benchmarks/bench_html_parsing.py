@@ -0,0 +1,62 @@
+# benchmarks/bench_html_parsing.py
+"""
+Compares the html.parser extraction path with the lxml fast path over the
+saved HTML fixtures in benchmarks/fixtures/html/ (drop real portal pages
+there to benchmark them too).
+
+Usage:
+    python -m benchmarks.bench_html_parsing [--iterations 5]
+"""
+
+import argparse
+import glob
+import os
+import time
+from services.html_extract_service import (
+    _extract_readable, _extract_readable_legacy, _extract_main_text, _extract_basic_fallback_legacy,
+)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+
+PATHS = [
+    ("readability", _extract_readable_legacy, _extract_readable),
+    ("main-content", _extract_basic_fallback_legacy, _extract_main_text),
+]
+
+def _time_it(func, content: bytes, iterations: int) -> tuple[float, str]:
+    text = func(content)  # warm-up, and the output used for the size comparison
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func(content)
+    return (time.perf_counter() - started) / iterations, text
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML extraction paths over saved fixtures.")
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    fixtures = sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))
+    if not fixtures:
+        print(f"No fixtures in {FIXTURE_DIR}. Run: python -m benchmarks.fixtures.make_html_fixtures")
+        return
+
+    print(f"{'FIXTURE':<22} {'KIB':>6} {'PATH':<13} {'OLD ms':>8} {'NEW ms':>8} {'SPEEDUP':>8} {'OLD chars':>10} {'NEW chars':>10}")
+    totals = {name: [0.0, 0.0] for name, _, _ in PATHS}
+    for path in fixtures:
+        with open(path, "rb") as f:
+            content = f.read()
+        for name, old_func, new_func in PATHS:
+            old_time, old_text = _time_it(old_func, content, args.iterations)
+            new_time, new_text = _time_it(new_func, content, args.iterations)
+            totals[name][0] += old_time
+            totals[name][1] += new_time
+            print(f"{os.path.basename(path):<22} {len(content) // 1024:>6} {name:<13} {old_time * 1000:>8.1f} "
+                  f"{new_time * 1000:>8.1f} {old_time / new_time:>7.1f}x {len(old_text or ''):>10} {len(new_text or ''):>10}")
+
+    print()
+    for name, (old_total, new_total) in totals.items():
+        print(f"{name}: {len(fixtures) / old_total:.1f} pages/s -> {len(fixtures) / new_total:.1f} pages/s "
+              f"({old_total / new_total:.1f}x)")
+
+if __name__ == "__main__":
+    main()
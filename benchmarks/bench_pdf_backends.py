@@ -0,0 +1,156 @@
+# benchmarks/bench_pdf_backends.py
+"""
+Compares the PDF text backends in utils/pdf_backends.py over a corpus of PDFs:
+the generated summaries in shared/ plus anything in benchmarks/fixtures/pdf/
+(run `python -m benchmarks.fixtures.make_pdf_fixtures` for a long circular,
+or drop real scheme PDFs there).
+
+Each backend runs in its own child process, so its peak RSS is measured in isolation.
+
+With --parallel, times extracting the first N pages of the longest PDF in-process
+and across the worker pool (utils/pdf_utils.py, warm pool, PDF_WORKERS workers),
+for the page counts each backend's parallel_min_pages is chosen from. OVERHEAD is
+what the pool adds in total work (temporary file, document opened once per batch,
+results sent back); it is only shown on a single core, where it is POOL - SERIAL.
+The pool is worth starting once it saves a quarter of SERIAL with two workers,
+i.e. once SERIAL is about four times OVERHEAD.
+
+Usage:
+    python -m benchmarks.bench_pdf_backends [--iterations 3] [--parallel] [paths ...]
+"""
+
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_GLOBS = [
+    os.path.join(PROJECT_ROOT, "shared", "*.pdf"),
+    os.path.join(PROJECT_ROOT, "benchmarks", "fixtures", "pdf", "*.pdf"),
+]
+
+def _peak_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # ru_maxrss is KiB on Linux
+
+def run_backend(name: str, paths: list[str], iterations: int) -> dict:
+    """Child-process side: extracts every page of every PDF `iterations` times."""
+    from utils.pdf_backends import get_backend
+    backend = get_backend(name)
+    documents = []
+    for path in paths:
+        with open(path, "rb") as f:
+            documents.append(f.read())
+    baseline_rss = _peak_rss_mib()
+
+    pages = chars = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for data in documents:
+            texts = backend.extract_pages(data, list(range(backend.page_count(data))))
+            pages += len(texts)
+            chars += sum(len(text) for text in texts)
+    elapsed = time.perf_counter() - started
+    return {
+        "backend": name,
+        "pages": pages // iterations,
+        "chars": chars // iterations,
+        "pages_per_sec": pages / elapsed if elapsed else 0.0,
+        "peak_rss_mib": _peak_rss_mib(),
+        "baseline_rss_mib": baseline_rss,
+    }
+
+def run_parallel(name: str, path: str, iterations: int) -> list[dict]:
+    """Child-process side: best-of-`iterations` serial and pool times for growing page counts."""
+    import utils.pdf_utils as pdf_utils
+    from utils.pdf_backends import get_backend
+    backend = get_backend(name)
+    with open(path, "rb") as f:
+        data = f.read()
+    page_count = backend.page_count(data)
+    pdf_utils._extract_pages_parallel(name, data, [0])  # start the workers
+
+    def best(action) -> float:
+        times = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            action()
+            times.append(time.perf_counter() - started)
+        return min(times) * 1000
+
+    rows = []
+    for pages in sorted({n for n in (8, 16, 32, 48, 64, 96, 128, 192, 256) if n < page_count} | {page_count}):
+        numbers = list(range(pages))
+        rows.append({
+            "pages": pages,
+            "serial_ms": best(lambda: backend.extract_pages(data, numbers)),
+            "pool_ms": best(lambda: pdf_utils._extract_pages_parallel(name, data, numbers)),
+        })
+    pdf_utils._reset_pdf_pool()
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text backends over a corpus of PDFs.")
+    parser.add_argument("paths", nargs="*", help="PDFs to use instead of the default corpus")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--parallel", action="store_true", help="Time serial vs worker-pool extraction by page count")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(p for pattern in CORPUS_GLOBS for p in glob.glob(pattern))
+    if args.child:
+        result = run_parallel(args.child, paths[0], args.iterations) if args.parallel else run_backend(args.child, paths, args.iterations)
+        print(json.dumps(result))
+        return
+    if not paths:
+        print("No PDFs found. Run: python -m benchmarks.fixtures.make_pdf_fixtures")
+        return
+
+    from utils.pdf_backends import BACKENDS
+    if args.parallel:
+        from utils.pdf_utils import PDF_WORKERS
+        longest = max(paths, key=os.path.getsize)
+        print(f"{os.path.basename(longest)}, {PDF_WORKERS} workers on {os.cpu_count()} CPUs, best of {args.iterations}\n")
+        print(f"{'BACKEND':<8} {'PAGES':>6} {'SERIAL ms':>10} {'POOL ms':>10} {'OVERHEAD ms':>12} {'ms/PAGE':>8}")
+        for name, backend in BACKENDS.items():
+            if not backend.available():
+                continue
+            child = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_pdf_backends", "--child", name, "--parallel",
+                 "--iterations", str(args.iterations), longest],
+                cwd=PROJECT_ROOT, capture_output=True, text=True,
+            )
+            if child.returncode != 0:
+                print(f"{name:<8} failed: {child.stderr.strip().splitlines()[-1] if child.stderr.strip() else child.returncode}")
+                continue
+            for r in json.loads(child.stdout.strip().splitlines()[-1]):
+                overhead = f"{r['pool_ms'] - r['serial_ms']:.1f}" if os.cpu_count() == 1 else "-"
+                print(f"{name:<8} {r['pages']:>6} {r['serial_ms']:>10.1f} {r['pool_ms']:>10.1f} {overhead:>12} "
+                      f"{r['serial_ms'] / r['pages']:>8.2f}")
+        return
+
+    total_kib = sum(os.path.getsize(p) for p in paths) // 1024
+    print(f"Corpus: {len(paths)} PDFs, {total_kib} KiB, {args.iterations} iterations\n")
+    print(f"{'BACKEND':<8} {'PAGES':>6} {'CHARS':>9} {'PAGES/S':>9} {'PEAK RSS MiB':>13} {'+EXTRACT MiB':>13}")
+    for name, backend in BACKENDS.items():
+        if not backend.available():
+            print(f"{name:<8} not installed")
+            continue
+        child = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_pdf_backends", "--child", name,
+             "--iterations", str(args.iterations), *paths],
+            cwd=PROJECT_ROOT, capture_output=True, text=True,
+        )
+        if child.returncode != 0:
+            print(f"{name:<8} failed: {child.stderr.strip().splitlines()[-1] if child.stderr.strip() else child.returncode}")
+            continue
+        r = json.loads(child.stdout.strip().splitlines()[-1])
+        print(f"{name:<8} {r['pages']:>6} {r['chars']:>9} {r['pages_per_sec']:>9.1f} "
+              f"{r['peak_rss_mib']:>13.1f} {r['peak_rss_mib'] - r['baseline_rss_mib']:>13.1f}")
+
+if __name__ == "__main__":
+    main()
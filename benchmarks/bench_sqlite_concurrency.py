@@ -0,0 +1,118 @@
+# benchmarks/bench_sqlite_concurrency.py
+"""
+Measures url_cache read and write throughput in utils/db_cache.py with N
+parallel sessions (threads, as Streamlit runs them), comparing:
+
+  per-call  a new connection per call on a rollback-journal database (the old behaviour)
+  pooled    one WAL connection per thread with the tuned pragmas (_get_db_connection)
+
+Each run uses a fresh temporary database seeded with --rows entries; the
+tracked cache.db is never touched.
+
+Usage:
+    python -m benchmarks.bench_sqlite_concurrency [--sessions 1 4 8] [--seconds 2] [--write-ratio 0.2]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+import utils.db_cache as db_cache
+from utils.logger import logger
+
+def _per_call_connection():
+    return sqlite3.connect(db_cache.DB_NAME)
+
+class _ErrorCounter(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+def _seed(db_path: str, rows: int, content: str, wal: bool):
+    db_cache.DB_NAME = db_path
+    db_cache.init_db()
+    for i in range(rows):
+        db_cache.save_url_cache(f"https://scheme.example.gov.in/page/{i}", content)
+    db_cache.close_db_connection()
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode = {'WAL' if wal else 'DELETE'}")
+    conn.close()
+
+def run(mode: str, sessions: int, seconds: float, write_ratio: float, rows: int, content: str) -> dict:
+    """Runs `sessions` threads for `seconds` against a fresh database; returns op counts per second."""
+    original = db_cache._get_db_connection
+    with tempfile.TemporaryDirectory() as tmp:
+        _seed(os.path.join(tmp, "bench.db"), rows, content, wal=mode == "pooled")
+        if mode == "per-call":
+            db_cache._get_db_connection = _per_call_connection
+        counts = {"reads": 0, "writes": 0}
+        lock = threading.Lock()
+        start = threading.Barrier(sessions + 1)
+        deadline = [0.0]
+
+        def session(seed: int):
+            rng = random.Random(seed)
+            reads = writes = 0
+            start.wait()
+            while time.perf_counter() < deadline[0]:
+                url = f"https://scheme.example.gov.in/page/{rng.randrange(rows)}"
+                if rng.random() < write_ratio:
+                    db_cache.save_url_cache(url, content)
+                    writes += 1
+                else:
+                    db_cache.get_url_cache_entry(url)
+                    reads += 1
+            db_cache.close_db_connection()
+            with lock:
+                counts["reads"] += reads
+                counts["writes"] += writes
+
+        errors = _ErrorCounter()
+        logger.addHandler(errors)
+        threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+        try:
+            for thread in threads:
+                thread.start()
+            deadline[0] = time.perf_counter() + seconds
+            start.wait()
+            for thread in threads:
+                thread.join()
+        finally:
+            logger.removeHandler(errors)
+            db_cache._get_db_connection = original
+
+    return {
+        "reads_per_sec": counts["reads"] / seconds,
+        "writes_per_sec": counts["writes"] / seconds,
+        "errors": errors.count,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite cache throughput with parallel sessions.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Fraction of operations that are writes")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--content-kb", type=int, default=20, help="Size of each cached page")
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    content = ("Eligibility, benefits and how to apply. " * (args.content_kb * 1024 // 40 + 1))[:args.content_kb * 1024]
+    print(f"{args.rows} cached pages of {args.content_kb} KiB, {args.write_ratio:.0%} writes, {args.seconds:g}s per run\n")
+    print(f"{'MODE':<9} {'SESSIONS':>8} {'READS/S':>9} {'WRITES/S':>9} {'TOTAL/S':>9} {'ERRORS':>7}")
+    for sessions in args.sessions:
+        for mode in ("per-call", "pooled"):
+            r = run(mode, sessions, args.seconds, args.write_ratio, args.rows, content)
+            print(f"{mode:<9} {sessions:>8} {r['reads_per_sec']:>9.0f} {r['writes_per_sec']:>9.0f} "
+                  f"{r['reads_per_sec'] + r['writes_per_sec']:>9.0f} {r['errors']:>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/cache_compression_report.py
+"""
+Reports how much compressed payloads (utils/cache_codec.py) shrink a cache
+database. The database is copied twice to a temporary directory and both
+copies are migrated to the current schema, one with compression disabled;
+the original file is only read.
+
+Both copies are VACUUMed before measuring, so the sizes compare live data
+rather than free pages.
+
+Usage:
+    python -m benchmarks.cache_compression_report [--db cache.db]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+
+import utils.db_cache as db_cache
+from utils import cache_codec
+
+PAYLOADS = {
+    "scheme_cache": ("summary_en", "summary_te"),
+    "url_cache": ("content",),
+}
+
+def migrate_and_measure(db_path: str, compress: bool) -> dict:
+    """Migrates the database at `db_path`, vacuums it and returns its file size and payload bytes per table."""
+    cache_codec.CACHE_COMPRESSION = compress
+    db_cache.DB_NAME = db_path
+    db_cache.init_db()
+    db_cache.close_db_connection()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.execute("VACUUM")
+    report = {"file_bytes": os.path.getsize(db_path), "tables": {}}
+    for table, fields in PAYLOADS.items():
+        total = " + ".join(f"COALESCE(LENGTH(CAST({field} AS BLOB)), 0)" for field in fields)
+        rows, payload = conn.execute(f"SELECT COUNT(*), COALESCE(SUM({total}), 0) FROM {table}").fetchone()
+        report["tables"][table] = {"rows": rows, "payload_bytes": payload}
+    conn.close()
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the size reduction from compressing cache payloads.")
+    parser.add_argument("--db", default="cache.db")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_path = os.path.join(tmp, "before.db")
+        after_path = os.path.join(tmp, "after.db")
+        # The backup API gives a consistent copy even if the app is writing (including its WAL)
+        with sqlite3.connect(f"file:{args.db}?mode=ro", uri=True) as source, sqlite3.connect(before_path) as target:
+            source.backup(target)
+        shutil.copyfile(before_path, after_path)
+
+        before = migrate_and_measure(before_path, compress=False)
+        after = migrate_and_measure(after_path, compress=True)
+
+    print(f"{'TABLE':<14} {'ROWS':>6} {'PAYLOAD BEFORE':>15} {'PAYLOAD AFTER':>14} {'RATIO':>6}")
+    for table in PAYLOADS:
+        b, a = before["tables"][table], after["tables"][table]
+        ratio = a["payload_bytes"] / b["payload_bytes"] if b["payload_bytes"] else 1.0
+        print(f"{table:<14} {b['rows']:>6} {b['payload_bytes']:>15,} {a['payload_bytes']:>14,} {ratio:>6.2f}")
+    print(f"\nDatabase file: {before['file_bytes']:,} -> {after['file_bytes']:,} bytes "
+          f"({1 - after['file_bytes'] / before['file_bytes']:.0%} smaller)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/fixtures/make_html_fixtures.py
+"""
+Writes the saved HTML fixtures used by the parsing benchmark.
+
+The pages mirror the shape of the catalog portals: mega-menus with
+hundreds of links, many inline scripts, large footers, and a comparatively
+small block of scheme text. Output is deterministic.
+
+Usage:
+    python -m benchmarks.fixtures.make_html_fixtures
+"""
+
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "html")
+
+WORDS = (
+    "scheme eligibility benefit farmer student pension subsidy application portal district "
+    "registration document income certificate aadhaar bank account installment beneficiary "
+    "ministry department guidelines verification approval disbursement helpline grievance"
+).split()
+
+TELUGU_WORDS = "పథకం అర్హత ప్రయోజనం రైతు విద్యార్థి పింఛను దరఖాస్తు జిల్లా ధృవపత్రం బ్యాంకు ఖాతా లబ్ధిదారు".split()
+
+def _sentence(rng, words, n=18):
+    return " ".join(rng.choice(words) for _ in range(n)).capitalize() + "."
+
+def _menu(rng, items):
+    links = "".join(f'<li><a href="/menu/{i}">{_sentence(rng, WORDS, 3)}</a></li>' for i in range(items))
+    return f'<nav class="mega-menu"><ul>{links}</ul></nav>'
+
+def _scripts(rng, count, size):
+    body = "var x=" + "".join(rng.choice("abcdef0123456789") for _ in range(size)) + ";"
+    return "".join(f"<script>/* tracker {i} */{body}</script>" for i in range(count))
+
+def _footer(rng, items):
+    cols = "".join(f'<div class="col"><a href="/f/{i}">{_sentence(rng, WORDS, 4)}</a></div>' for i in range(items))
+    return f"<footer>{cols}</footer>"
+
+def heavy_portal(rng) -> str:
+    paragraphs = "".join(f"<p>{_sentence(rng, WORDS, 30)}</p>" for _ in range(60))
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Scheme Portal</title>"
+        f"<style>{'.x{color:red}' * 1500}</style>{_scripts(rng, 30, 6000)}</head><body>"
+        f"<header><h1>Government of India</h1>{_menu(rng, 1500)}</header>"
+        f'<div id="wrapper"><aside>{_menu(rng, 200)}</aside>'
+        f'<main><h2>About the Scheme</h2>{paragraphs}</main></div>'
+        f"{_footer(rng, 400)}{_scripts(rng, 10, 3000)}</body></html>"
+    )
+
+def telugu_portal(rng) -> str:
+    rows = "".join(
+        f"<tr><td>{_sentence(rng, TELUGU_WORDS, 4)}</td><td>{_sentence(rng, TELUGU_WORDS, 12)}</td></tr>"
+        for _ in range(120)
+    )
+    paragraphs = "".join(f"<p>{_sentence(rng, TELUGU_WORDS, 25)}</p>" for _ in range(40))
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>పథకం వివరాలు</title>"
+        f"{_scripts(rng, 15, 5000)}</head><body><header>{_menu(rng, 800)}</header>"
+        f'<article><h1>పథకం వివరాలు</h1>{paragraphs}<table>{rows}</table></article>'
+        f"{_footer(rng, 300)}</body></html>"
+    )
+
+def div_soup_portal(rng) -> str:
+    blocks = "".join(
+        f'<div class="row"><div class="cell"><span>{_sentence(rng, WORDS, 22)}</span></div></div>'
+        for _ in range(150)
+    )
+    widgets = "".join(f'<div class="widget">{_sentence(rng, WORDS, 6)}</div>' for _ in range(500))
+    return (
+        "<html><head><title>Scheme</title>"
+        f"{_scripts(rng, 20, 4000)}</head><body><div id='top'>{_menu(rng, 1000)}</div>"
+        f'<div class="page-content">{blocks}</div><div class="sidebar">{widgets}</div>'
+        f"{_footer(rng, 200)}</body></html>"
+    )
+
+def main():
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for name, builder in (("heavy_portal", heavy_portal), ("telugu_portal", telugu_portal), ("div_soup_portal", div_soup_portal)):
+        path = os.path.join(FIXTURE_DIR, f"{name}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(builder(random.Random(name)))
+        print(f"Wrote {path} ({os.path.getsize(path) // 1024} KiB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# benchmarks/fixtures/make_pdf_fixtures.py
+"""
+Writes the PDF fixture used by the PDF backend benchmark: a long
+government-circular-style document with headings, dense paragraphs and
+eligibility tables. Output is deterministic.
+
+Usage:
+    python -m benchmarks.fixtures.make_pdf_fixtures [--pages 120]
+"""
+
+import argparse
+import os
+import random
+from fpdf import FPDF
+from benchmarks.fixtures.make_html_fixtures import WORDS, _sentence
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "pdf")
+
+def make_circular(pages: int, seed: int = 7) -> FPDF:
+    rng = random.Random(seed)
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    for page in range(pages):
+        pdf.add_page()
+        pdf.set_font("helvetica", "B", 13)
+        pdf.multi_cell(0, 8, f"G.O. Ms. No. {100 + page} - {_sentence(rng, WORDS, 6)}", new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("helvetica", size=10)
+        for _ in range(4):
+            pdf.multi_cell(0, 5, " ".join(_sentence(rng, WORDS) for _ in range(3)), new_x="LMARGIN", new_y="NEXT")
+            pdf.ln(2)
+        # Eligibility table: the layout that is slowest for pure-Python extractors
+        for row in range(8):
+            for col in range(4):
+                pdf.cell(47, 6, f"{rng.choice(WORDS)} {row}.{col}", border=1)
+            pdf.ln()
+    return pdf
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the PDF benchmark fixture.")
+    parser.add_argument("--pages", type=int, default=120)
+    args = parser.parse_args()
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, "long_circular.pdf")
+    make_circular(args.pages).output(path)
+    print(f"Wrote {path} ({os.path.getsize(path) // 1024} KiB)")
+
+if __name__ == "__main__":
+    main()
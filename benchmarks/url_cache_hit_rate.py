@@ -0,0 +1,90 @@
+# benchmarks/url_cache_hit_rate.py
+"""
+Replays the URLs from an access log and compares the url_cache hit rate
+when keying on the raw URL (old behaviour) versus the canonical URL.
+
+Every "URL requested: <url>" line logged by get_url_content counts as one
+request; a plain file with one URL per line works too. Redirects recorded
+in url_alias are followed when --db points at a cache database.
+
+Usage:
+    python -m benchmarks.url_cache_hit_rate app.log [more.log ...] [--db cache.db]
+"""
+
+import argparse
+import re
+import sqlite3
+from collections import defaultdict
+from utils.url_utils import canonicalize_url
+
+_REQUEST_RE = re.compile(r"URL requested: (\S+)")
+_URL_RE = re.compile(r"^\s*((?:https?://)?[\w.-]+\.[a-z]{2,}\S*)\s*$", re.I)
+
+def read_requests(paths: list[str]) -> list[str]:
+    """Returns the requested URLs from the given log files, in order."""
+    urls = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                match = _REQUEST_RE.search(line) or _URL_RE.match(line)
+                if match:
+                    urls.append(match.group(1))
+    return urls
+
+def load_aliases(db_path: str | None) -> dict:
+    if not db_path:
+        return {}
+    conn = sqlite3.connect(db_path)
+    try:
+        return dict(conn.execute("SELECT alias, canonical FROM url_alias").fetchall())
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+
+def replay(urls: list[str], key_func) -> tuple[int, int]:
+    """Counts hits for an unbounded cache: a request hits if its key was requested before."""
+    seen = set()
+    hits = 0
+    for url in urls:
+        key = key_func(url)
+        if key in seen:
+            hits += 1
+        seen.add(key)
+    return hits, len(seen)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare url_cache hit rates for raw and canonical keys.")
+    parser.add_argument("logs", nargs="+", help="Log files containing requested URLs")
+    parser.add_argument("--db", help="Cache database whose url_alias redirects should be followed")
+    args = parser.parse_args()
+
+    urls = read_requests(args.logs)
+    if not urls:
+        print("No requested URLs found in the given logs.")
+        return
+
+    aliases = load_aliases(args.db)
+    def canonical_key(url):
+        key = canonicalize_url(url)
+        return aliases.get(key, key)
+
+    raw_hits, raw_keys = replay(urls, lambda url: url)
+    canonical_hits, canonical_keys = replay(urls, canonical_key)
+
+    print(f"Requests:             {len(urls)}")
+    print(f"Raw keys:             {raw_keys:>6}   hit rate {raw_hits / len(urls):6.1%}")
+    print(f"Canonical keys:       {canonical_keys:>6}   hit rate {canonical_hits / len(urls):6.1%}")
+    print(f"Fetches avoided:      {canonical_hits - raw_hits}")
+
+    spellings = defaultdict(set)
+    for url in urls:
+        spellings[canonical_key(url)].add(url)
+    merged = sorted(((len(v), k) for k, v in spellings.items() if len(v) > 1), reverse=True)
+    if merged:
+        print("\nMost-aliased pages:")
+        for count, key in merged[:10]:
+            print(f"  {count:>3} spellings -> {key}")
+
+if __name__ == "__main__":
+    main()
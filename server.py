@@ -0,0 +1,15 @@
+# server.py
+"""
+Entry point that runs app.py together with the routes serving summary PDFs
+from the shared directory (see services/pdf_server.py) and cache metrics
+(see services/metrics_server.py).
+
+Usage:
+    streamlit run server.py
+"""
+
+import streamlit as st
+from services.metrics_server import metrics_routes
+from services.pdf_server import shared_pdf_routes
+
+app = st.App("app.py", routes=shared_pdf_routes() + metrics_routes())
@@ -0,0 +1,186 @@
+# services/browser_pool.py
+
+import atexit
+import json
+import os
+import queue
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+from utils.logger import logger
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BROWSER_POOL_WORKERS = int(os.getenv("BROWSER_POOL_WORKERS", "2"))
+BROWSER_TASK_TIMEOUT = float(os.getenv("BROWSER_TASK_TIMEOUT", "60"))
+# Total memory all browser workers (and their Chrome processes) may use on this replica
+BROWSER_POOL_MEMORY_MB = int(os.getenv("BROWSER_POOL_MEMORY_MB", "2048"))
+BROWSER_WORKER_MAX_TASKS = int(os.getenv("BROWSER_WORKER_MAX_TASKS", "50"))
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def _group_rss_bytes(pgid: int) -> int:
+    """Sums the resident memory of every process in a process group (Linux /proc)."""
+    total = 0
+    try:
+        pids = [p for p in os.listdir("/proc") if p.isdigit()]
+    except OSError:
+        return 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            # Fields after the command name: state(0) ppid(1) pgrp(2) ... rss(21)
+            if int(fields[2]) == pgid:
+                total += int(fields[21]) * _PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+class _Worker:
+    """One worker process and the Chrome processes it starts, all in one process group."""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "services.browser_worker"],
+            cwd=PROJECT_ROOT,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            start_new_session=True,
+        )
+        self.tasks = 0
+        logger.info(f"Started browser worker pid={self.process.pid}")
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def kill(self):
+        """Kills the worker and everything it spawned (chromedriver, Chrome, renderers)."""
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+
+class BrowserPool:
+    """
+    Runs browser extraction in supervised worker processes, outside the
+    Streamlit script thread.
+
+    - Each task has a wall-clock deadline; on expiry the worker's whole
+      process group is killed.
+    - Each worker's process group is held to `memory_limit_mb` of resident
+      memory, so the pool as a whole never exceeds workers * memory_limit_mb.
+    - Dead, killed or worn-out workers are replaced on next use.
+
+    Workers are plain subprocesses started in their own session rather than a
+    multiprocessing pool, so a deadline or memory kill takes down the whole
+    process group, including chromedriver and Chrome.
+    """
+
+    def __init__(self, workers: int = BROWSER_POOL_WORKERS, task_timeout: float = BROWSER_TASK_TIMEOUT,
+                 memory_limit_mb: int | None = None, max_tasks_per_worker: int = BROWSER_WORKER_MAX_TASKS):
+        self.task_timeout = task_timeout
+        self.memory_limit_bytes = (memory_limit_mb or BROWSER_POOL_MEMORY_MB // max(workers, 1)) * 1024 * 1024
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._idle = queue.Queue()
+        self._all = set()
+        self._lock = threading.Lock()
+        for _ in range(workers):
+            self._idle.put(None)  # Workers are started lazily on first use
+
+    def run(self, method: str, url: str, timeout: float | None = None) -> str | None:
+        """Runs one extraction task; returns its text, or None on failure, timeout or memory overrun."""
+        timeout = timeout if timeout is not None else self.task_timeout
+        deadline = time.monotonic() + timeout
+        try:
+            worker = self._idle.get(timeout=max(deadline - time.monotonic(), 0))
+        except queue.Empty:
+            logger.warning(f"No browser worker free in time for {url}")
+            return None
+
+        try:
+            if worker is None or not worker.alive():
+                worker = self._spawn()
+            return self._dispatch(worker, method, url, deadline, timeout)
+        except Exception as e:
+            logger.error(f"Browser worker failed on {url}: {e}")
+            self._retire(worker)
+            worker = None
+            return None
+        finally:
+            if worker is not None and worker.alive() and worker.tasks >= self.max_tasks_per_worker:
+                self._retire(worker)
+                worker = None
+            self._idle.put(worker if worker is not None and worker.alive() else None)
+
+    def _dispatch(self, worker: _Worker, method: str, url: str, deadline: float, timeout: float) -> str | None:
+        worker.tasks += 1
+        # The worker gets most of the remaining budget so it can wrap up before it would be killed
+        budget = max(min(deadline - time.monotonic(), timeout), 0) * 0.9
+        worker.process.stdin.write(json.dumps({"method": method, "url": url, "timeout": budget}) + "\n")
+        worker.process.stdin.flush()
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Browser task exceeded its deadline, killing worker pid={worker.process.pid}: {url}")
+                self._retire(worker)
+                return None
+            ready, _, _ = select.select([worker.process.stdout], [], [], min(remaining, 1.0))
+            if ready:
+                line = worker.process.stdout.readline()
+                if not line:
+                    logger.warning(f"Browser worker pid={worker.process.pid} died on {url}")
+                    self._retire(worker)
+                    return None
+                result = json.loads(line)
+                if result.get("error"):
+                    logger.warning(f"Browser extraction error for {url}: {result['error']}")
+                return result.get("text")
+            rss = _group_rss_bytes(worker.process.pid)
+            if rss > self.memory_limit_bytes:
+                logger.warning(f"Browser worker pid={worker.process.pid} over memory limit "
+                               f"({rss // 2**20} MiB), killing: {url}")
+                self._retire(worker)
+                return None
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker()
+        with self._lock:
+            self._all.add(worker)
+        return worker
+
+    def _retire(self, worker: _Worker | None):
+        if worker is None:
+            return
+        worker.kill()
+        with self._lock:
+            self._all.discard(worker)
+
+    def shutdown(self):
+        with self._lock:
+            workers = list(self._all)
+            self._all.clear()
+        for worker in workers:
+            worker.kill()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_browser_pool() -> BrowserPool:
+    """Returns the process-wide browser pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BrowserPool()
+                atexit.register(_pool.shutdown)
+    return _pool
@@ -0,0 +1,32 @@
+# services/browser_worker.py
+"""
+Worker process for browser-based extraction, supervised by services/browser_pool.py.
+
+Reads one JSON task per line on stdin ({"method": "selenium" | "playwright", "url": ..., "timeout": seconds})
+and answers with one JSON line on stdout ({"text": ... | null, "error": ... | null}).
+"""
+
+import json
+import sys
+
+def main():
+    # The extraction code logs with print(); keep stdout for the protocol only
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+
+    from services.html_extract_service import _extract_with_selenium, extract_with_playwright
+    from utils.deadline import Deadline
+    methods = {"selenium": _extract_with_selenium, "playwright": extract_with_playwright}
+
+    for line in sys.stdin:
+        try:
+            task = json.loads(line)
+            text = methods[task["method"]](task["url"], Deadline(task["timeout"]))
+            result = {"text": text, "error": None}
+        except Exception as e:
+            result = {"text": None, "error": str(e)}
+        protocol_out.write(json.dumps(result) + "\n")
+        protocol_out.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# services/cache_server.py
+"""
+Small HTTP cache server that app replicas share (CACHE_SHARED_BACKEND=http://host:port).
+
+Stores opaque records in a SQLite file through utils/cache_backends.SQLiteBackend:
+
+  GET    /cache/<key>   200 with the record, or 404
+  PUT    /cache/<key>   stores the request body
+  DELETE /cache/<key>   204
+  GET    /health        200
+
+PUT and DELETE need CACHE_SHARED_TOKEN (or --token) as a bearer token
+(Authorization: Bearer <token>): 401 without one, 403 for a wrong one. The
+server does not start without a token.
+
+Records older than --days-old are expired hourly.
+
+Usage:
+    python -m services.cache_server [--host 127.0.0.1] [--port 8765] [--db shared-cache.db] [--days-old 7] [--token ...]
+"""
+
+import argparse
+import hmac
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+from utils.cache_backends import CACHE_SHARED_TOKEN, SQLiteBackend
+from utils.logger import logger
+
+MAX_RECORD_BYTES = 32 * 1024 * 1024
+
+class _CacheHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so clients reuse connections
+    disable_nagle_algorithm = True  # Headers and body are separate writes; don't hold the body for an ACK
+    store: SQLiteBackend = None
+    token: str = ""
+
+    def _key(self) -> str | None:
+        if not self.path.startswith("/cache/"):
+            return None
+        return unquote(self.path[len("/cache/"):]) or None
+
+    def _authorized(self) -> bool:
+        """Checks the bearer token of a write; replies 401/403 and returns False if it is missing or wrong."""
+        scheme, _, token = self.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token.strip():
+            self._reply(401, b"unauthorized", "text/plain")
+            return False
+        if not (self.token and hmac.compare_digest(token.strip().encode(), self.token.encode())):
+            self._reply(403, b"forbidden", "text/plain")
+            return False
+        return True
+
+    def _reply(self, status: int, body: bytes = b"", content_type: str = "application/octet-stream"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self._reply(200, b"ok", "text/plain")
+        key = self._key()
+        value = self.store.get_raw(key) if key else None
+        if value is None:
+            return self._reply(404, b"not found", "text/plain")
+        self._reply(200, value)
+
+    def do_PUT(self):
+        key = self._key()
+        length = int(self.headers.get("Content-Length") or 0)
+        if not self._authorized():
+            self.close_connection = True  # The body is not read
+            return
+        if not key or length > MAX_RECORD_BYTES:
+            self.rfile.read(length)
+            return self._reply(400, b"bad request", "text/plain")
+        self.store.put_raw(key, self.rfile.read(length))
+        self._reply(204)
+
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+        key = self._key()
+        if key:
+            self.store.delete_raw(key)
+        self._reply(204)
+
+    def log_message(self, format, *args):
+        pass  # One line per request would flood the log
+
+def create_server(host: str, port: int, db_path: str, token: str = CACHE_SHARED_TOKEN) -> ThreadingHTTPServer:
+    """A server ready for serve_forever(); port 0 picks a free port (see server.server_address)."""
+    handler = type("CacheHandler", (_CacheHandler,), {"store": SQLiteBackend(db_path), "token": token})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the shared cache server for app replicas.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default="shared-cache.db", help="SQLite file holding the records")
+    parser.add_argument("--days-old", type=float, default=7, help="Age after which records expire")
+    parser.add_argument("--token", default=CACHE_SHARED_TOKEN, help="Bearer token for writes (default CACHE_SHARED_TOKEN)")
+    args = parser.parse_args()
+    if not args.token:
+        parser.error("set CACHE_SHARED_TOKEN or --token; writes would otherwise be open to anyone who can reach the port")
+
+    server = create_server(args.host, args.port, args.db, args.token)
+
+    def _expire():
+        while True:
+            removed = server.RequestHandlerClass.store.expire(args.days_old * 86400)
+            logger.info(f"Shared cache server expired {removed} records.")
+            time.sleep(3600)
+
+    threading.Thread(target=_expire, name="cache-server-expiry", daemon=True).start()
+    print(f"Shared cache server on http://{args.host}:{server.server_address[1]} ({args.db})")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
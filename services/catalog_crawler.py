@@ -0,0 +1,180 @@
+# services/catalog_crawler.py
+"""
+Pre-warms the url_cache with every portal listed in data/schemes.py,
+so users never wait on a cold fetch for a catalog scheme.
+
+Usage:
+    python -m services.catalog_crawler [--concurrency 6] [--per-host 1] [--rate 2]
+                                       [--retries 2] [--timeout 90] [--budget 900]
+                                       [--force] [--json report.json]
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from data.schemes import SCHEMES
+from services.html_extract_service import extract_url
+from utils.deadline import Deadline
+from utils.db_cache import init_db, get_url_cache_entry, save_url_cache, is_url_cache_fresh
+from utils.logger import logger
+from utils.url_utils import canonicalize_url
+
+class RateLimiter:
+    """Spaces out request starts so that at most `rate` begin per second, across all hosts."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+def get_catalog_urls() -> list[str]:
+    """Returns the scheme URLs from the catalog, one per cache key, in catalog order."""
+    seen = set()
+    urls = []
+    for scheme in SCHEMES:
+        url = scheme.get("url")
+        if url and canonicalize_url(url) not in seen:
+            seen.add(canonicalize_url(url))
+            urls.append(url)
+    return urls
+
+async def crawl_catalog(urls: list[str] | None = None, concurrency: int = 6, per_host: int = 1,
+                        rate: float = 2.0, retries: int = 2, timeout: float = 90.0,
+                        budget: float = 900.0, force: bool = False) -> list[dict]:
+    """
+    Fetches every URL concurrently and stores successful extractions in url_cache.
+
+    - `concurrency` caps fetches in flight overall, `per_host` caps them per host.
+    - `rate` caps how many fetches may start per second.
+    - Each attempt gets at most `timeout` seconds; failed attempts are retried
+      `retries` times with exponential backoff.
+    - `budget` bounds the whole crawl; URLs not reached in time are reported as "budget".
+
+    Returns one report dict per URL: url, status, strategy, latency, attempts, chars.
+    """
+    urls = urls if urls is not None else get_catalog_urls()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget
+    limiter = RateLimiter(rate)
+    global_slots = asyncio.Semaphore(concurrency)
+    host_slots = {}
+    # Extraction is blocking (requests / Selenium), so it runs on a dedicated pool
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="crawler")
+
+    async def crawl_one(url: str) -> dict:
+        report = {"url": url, "status": "failed", "strategy": None, "latency": 0.0, "attempts": 0, "chars": 0}
+        if not force:
+            # SQLite lookups block, so they run on a thread instead of stalling every host task
+            chars = await asyncio.to_thread(_fresh_cached_chars, url)
+            if chars is not None:
+                report["status"] = "fresh"
+                report["chars"] = chars
+                return report
+
+        host = urlsplit(url).netloc.lower()
+        host_sem = host_slots.setdefault(host, asyncio.Semaphore(per_host))
+        async with global_slots, host_sem:
+            for attempt in range(retries + 1):
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    report["status"] = "budget"
+                    break
+                await limiter.wait()
+                report["attempts"] = attempt + 1
+                started = time.perf_counter()
+                attempt_budget = min(timeout, remaining)
+                # The extraction honours its own deadline. A worker thread cannot be stopped, so an
+                # overrun is waited out: the host slot stays held and a retry never runs alongside it
+                future = loop.run_in_executor(executor, extract_url, url, Deadline(attempt_budget))
+                done, _ = await asyncio.wait({future}, timeout=attempt_budget + 5)
+                if not done:
+                    logger.warning(f"Extraction of {url} overran its {attempt_budget:.0f}s deadline; waiting for it.")
+                result = await future
+                report["latency"] = round(time.perf_counter() - started, 2)
+
+                text = result.get("text") or ""
+                if text and not text.startswith("Error:"):
+                    await asyncio.to_thread(save_url_cache, url, text, result.get("etag"), result.get("last_modified"),
+                                            final_url=result.get("final_url"))
+                    report.update(status="ok", strategy=result.get("strategy"), chars=len(text))
+                    break
+                if attempt < retries:
+                    await asyncio.sleep(min(2 ** attempt, max(deadline - loop.time(), 0)))
+        logger.info(f"Crawled {url}: {report['status']} via {report['strategy']} in {report['latency']}s")
+        return report
+
+    try:
+        return await asyncio.gather(*(crawl_one(url) for url in urls))
+    finally:
+        # Every attempt was awaited, so no worker is still running unless the crawl was cancelled
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _fresh_cached_chars(url: str) -> int | None:
+    """Length of the cached text for `url` if it is fresh, else None."""
+    entry = get_url_cache_entry(url)
+    if entry and entry.has_value("content") and is_url_cache_fresh(entry):
+        return len(entry["content"])
+    return None
+
+def start_background_prewarm(**kwargs) -> threading.Thread:
+    """Runs `crawl_catalog` on a daemon thread so the app can keep serving while it warms up."""
+    def _run():
+        init_db()
+        reports = asyncio.run(crawl_catalog(**kwargs))
+        ok = sum(1 for r in reports if r["status"] in ("ok", "fresh"))
+        logger.info(f"Catalog pre-warm finished: {ok}/{len(reports)} URLs cached.")
+
+    thread = threading.Thread(target=_run, name="catalog-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+def format_report(reports: list[dict]) -> str:
+    """Renders crawl reports as a fixed-width table."""
+    lines = [f"{'STATUS':<8} {'LATENCY':>8} {'TRIES':>5} {'CHARS':>7}  {'STRATEGY':<26} URL"]
+    for r in reports:
+        lines.append(f"{r['status']:<8} {r['latency']:>7.2f}s {r['attempts']:>5} {r['chars']:>7}  {str(r['strategy'] or '-'):<26} {r['url']}")
+    ok = [r for r in reports if r["status"] == "ok"]
+    lines.append("")
+    lines.append(f"{len(ok)} fetched, {sum(1 for r in reports if r['status'] == 'fresh')} already fresh, "
+                 f"{sum(1 for r in reports if r['status'] not in ('ok', 'fresh'))} failed or skipped")
+    if ok:
+        lines.append(f"Mean fetch latency: {sum(r['latency'] for r in ok) / len(ok):.2f}s")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warm url_cache with every scheme portal in the catalog.")
+    parser.add_argument("--concurrency", type=int, default=6, help="Maximum fetches in flight overall")
+    parser.add_argument("--per-host", type=int, default=1, help="Maximum fetches in flight per host")
+    parser.add_argument("--rate", type=float, default=2.0, help="Maximum fetch starts per second")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per URL after a failed attempt")
+    parser.add_argument("--timeout", type=float, default=90.0, help="Seconds allowed per attempt")
+    parser.add_argument("--budget", type=float, default=900.0, help="Seconds allowed for the whole crawl")
+    parser.add_argument("--force", action="store_true", help="Re-fetch URLs even if their cache entry is fresh")
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    init_db()
+    reports = asyncio.run(crawl_catalog(
+        concurrency=args.concurrency, per_host=args.per_host, rate=args.rate,
+        retries=args.retries, timeout=args.timeout, budget=args.budget, force=args.force,
+    ))
+    print(format_report(reports))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(reports, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# services/circuit_breaker.py
+
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+from utils.logger import logger
+
+NEGATIVE_CACHE_TTL_SECONDS = float(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", "300"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "120"))
+CIRCUIT_MAX_OPEN_SECONDS = float(os.getenv("CIRCUIT_MAX_OPEN_SECONDS", "1800"))
+
+class NegativeCache:
+    """Remembers URLs that recently failed extraction, for a short TTL."""
+
+    def __init__(self, ttl: float = NEGATIVE_CACHE_TTL_SECONDS, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, url: str):
+        with self._lock:
+            self._entries.pop(url, None)
+            self._entries[url] = time.monotonic() + self.ttl
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+
+    def remaining(self, url: str) -> float:
+        """Seconds until the failure expires, or 0 if the URL is not negatively cached."""
+        with self._lock:
+            expires_at = self._entries.get(url)
+            if expires_at is None:
+                return 0.0
+            left = expires_at - time.monotonic()
+            if left <= 0:
+                del self._entries[url]
+                return 0.0
+            return left
+
+    def discard(self, url: str):
+        with self._lock:
+            self._entries.pop(url, None)
+
+class CircuitBreaker:
+    """
+    Per-domain breaker. After `threshold` consecutive failures the domain is
+    "open" and calls fail fast. Once the open period passes, one probe is let
+    through ("half-open"): success closes the circuit, failure re-opens it
+    with a doubled open period, capped at `max_open_seconds`.
+    """
+
+    def __init__(self, threshold: int = CIRCUIT_FAILURE_THRESHOLD, open_seconds: float = CIRCUIT_OPEN_SECONDS,
+                 max_open_seconds: float = CIRCUIT_MAX_OPEN_SECONDS):
+        self.threshold = threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self._domains = {}
+        self._lock = threading.Lock()
+
+    def _state(self, domain: str) -> dict:
+        return self._domains.setdefault(domain, {"failures": 0, "open_until": 0.0, "open_for": self.open_seconds, "probe_started": 0.0})
+
+    def allow(self, domain: str) -> float:
+        """Returns 0 if a request to `domain` may proceed, else the seconds until the next probe."""
+        with self._lock:
+            state = self._state(domain)
+            if state["failures"] < self.threshold:
+                return 0.0
+            now = time.monotonic()
+            if now < state["open_until"]:
+                return state["open_until"] - now
+            if state["probe_started"] and now - state["probe_started"] < self.open_seconds:
+                # Another request is already probing this domain
+                return self.open_seconds - (now - state["probe_started"])
+            state["probe_started"] = now
+            logger.info(f"Circuit half-open, probing {domain}")
+            return 0.0
+
+    def record_success(self, domain: str):
+        with self._lock:
+            state = self._domains.pop(domain, None)
+        if state and state["failures"] >= self.threshold:
+            logger.info(f"Circuit closed for {domain}")
+
+    def record_failure(self, domain: str):
+        with self._lock:
+            state = self._state(domain)
+            state["failures"] += 1
+            if state["failures"] < self.threshold:
+                return
+            if state["probe_started"]:
+                state["open_for"] = min(state["open_for"] * 2, self.max_open_seconds)
+            state["probe_started"] = 0.0
+            state["open_until"] = time.monotonic() + state["open_for"]
+        logger.warning(f"Circuit open for {domain} for {state['open_for']:.0f}s after {state['failures']} failures")
+
+negative_cache = NegativeCache()
+circuit_breaker = CircuitBreaker()
+
+def domain_of(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+def check_available(url: str) -> str | None:
+    """
+    Returns an "Error: ..." message if `url` failed recently or its domain's
+    circuit is open, so callers can answer immediately instead of retrying.
+    """
+    wait = negative_cache.remaining(url)
+    if wait:
+        return f"Error: This page failed to load moments ago. Please try again in about {_minutes(wait)}."
+    wait = circuit_breaker.allow(domain_of(url))
+    if wait:
+        return (f"Error: {domain_of(url)} is currently unavailable or blocking automated access. "
+                f"Please try again in about {_minutes(wait)}.")
+    return None
+
+def record_result(url: str, ok: bool):
+    """Feeds an extraction outcome into the negative cache and the domain's circuit."""
+    if ok:
+        negative_cache.discard(url)
+        circuit_breaker.record_success(domain_of(url))
+    else:
+        negative_cache.add(url)
+        circuit_breaker.record_failure(domain_of(url))
+
+def _minutes(seconds: float) -> str:
+    minutes = max(1, round(seconds / 60))
+    return f"{minutes} minute{'s' if minutes != 1 else ''}"
@@ -1,9 +1,7 @@
 # services/html_extract_service.py
-import requests
+import os
 from readability import Document
 from bs4 import BeautifulSoup
-import os
-import certifi
 import json
 import re
 from selenium import webdriver
@@ -12,40 +10,98 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
-import time
+from utils.deadline import Deadline
+from utils.html_text import parse_html, readable_text, main_text, text_lines
+from services.resource_blocking import blocked_types_for, should_block, selenium_blocked_url_patterns
+from services.browser_pool import get_browser_pool, BROWSER_TASK_TIMEOUT
+from services.circuit_breaker import check_available, record_result
+from services.http_client import USER_AGENT, fetch_html, get_validators, conditional_get
+
+# Run browsers in supervised worker processes instead of the Streamlit script thread
+BROWSER_POOL_ENABLED = os.getenv("BROWSER_POOL_ENABLED", "True").lower() == "true"
 
-def extract_text_from_url(url: str) -> str:
+def extract_url(url: str, deadline: Deadline | None = None) -> dict:
+    """
+    Runs the extraction chain and returns {"text", "strategy", "etag", "last_modified"}.
+    The whole chain shares one `deadline` (EXTRACTION_DEADLINE_SECONDS by default).
+    `strategy` names the method that produced the text (None on failure).
+    URLs that failed moments ago, or whose domain's circuit is open, return
+    immediately with "unavailable": True instead of running the chain.
+    Validators and the post-redirect "final_url" are only available when a
+    requests-based method fetched the page.
+    """
+    unavailable = check_available(url)
+    if unavailable:
+        print(f"Skipping extraction for {url}: {unavailable}")
+        return {"text": unavailable, "strategy": None, "etag": None, "last_modified": None,
+                "final_url": None, "unavailable": True}
+    
+    deadline = deadline or Deadline()
+    text, strategy, meta = _run_extraction_chain(url, deadline)
+    if strategy is not None or not deadline.expired():
+        # A chain cut short by our own budget says nothing about the site, so it never trips the circuit
+        record_result(url, strategy is not None)
+    return {
+        "text": text,
+        "strategy": strategy,
+        "etag": meta.get("etag"),
+        "last_modified": meta.get("last_modified"),
+        "final_url": meta.get("final_url"),
+        "unavailable": False,
+    }
+
+def extract_text_from_url(url: str, deadline: Deadline | None = None) -> str:
     """
     Enhanced content extraction with multiple fallback strategies.
     """
+    text, _, _ = _run_extraction_chain(url, deadline or Deadline())
+    return text
+
+def _run_extraction_chain(url: str, deadline: Deadline) -> tuple[str, str | None, dict]:
+    """
+    Tries each extraction method in order; returns (text, method name, response meta).
+    Each method only gets the budget left on `deadline`, and the chain stops once it runs out.
+    Response meta (validators and "final_url") comes from the method that produced
+    the text, and is empty unless that method fetched the page with requests.
+    """
     print(f"Attempting to extract content from: {url}")
     
-    # Try multiple extraction methods in order
+    # Try multiple extraction methods in order; requests-based ones also return the response meta
+    selenium = _extract_with_selenium_isolated if BROWSER_POOL_ENABLED else _extract_with_selenium
     methods = [
-        ("Selenium with JavaScript", _extract_with_selenium),
+        ("Selenium with JavaScript", lambda url, deadline: (selenium(url, deadline), {})),
         ("Requests + Readability", _extract_with_requests),
         ("Basic Requests", _extract_basic)
     ]
     
     for method_name, method_func in methods:
+        if deadline.expired():
+            print(f"Deadline reached before trying {method_name}")
+            return "Error: Fetching the page took too long. The site may be slow or unavailable right now.", None, {}
         try:
             print(f"Trying method: {method_name}")
-            content = method_func(url)
+            content, meta = method_func(url, deadline)
             if content and len(content) > 200:  # Minimum content threshold
                 print(f"Successfully extracted content using {method_name}")
-                return content
+                return content, method_name, meta
             else:
                 print(f"Method {method_name} returned insufficient content")
         except Exception as e:
             print(f"Method {method_name} failed: {e}")
             continue
     
-    return "Error: Could not extract sufficient text from the URL. The page might require JavaScript, have anti-bot protection, or be inaccessible."
+    return "Error: Could not extract sufficient text from the URL. The page might require JavaScript, have anti-bot protection, or be inaccessible.", None, {}
 
 # In services/html_extract_service.py
 
-def _extract_with_selenium(url: str) -> str:
+def _extract_with_selenium_isolated(url: str, deadline: Deadline | None = None) -> str:
+    """Runs the Selenium extraction in a supervised worker process with a hard deadline."""
+    deadline = deadline or Deadline()
+    return get_browser_pool().run("selenium", url, timeout=deadline.timeout(BROWSER_TASK_TIMEOUT))
+
+def _extract_with_selenium(url: str, deadline: Deadline | None = None) -> str:
     """Extract content using Selenium for JavaScript-heavy pages."""
+    deadline = deadline or Deadline()
     try:
         # Configure Chrome options
         chrome_options = Options()
@@ -61,37 +117,46 @@ def _extract_with_selenium(url: str) -> str:
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         
+        # Skip images, media, fonts and trackers; only the visible text is used
+        blocked_patterns = selenium_blocked_url_patterns(url)
+        if "image" in blocked_types_for(url):
+            chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        
         # Initialize driver
         driver = webdriver.Chrome(options=chrome_options)
         
         try:
+            if blocked_patterns:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_patterns})
+            
             # Execute script to remove webdriver property
             driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             
-            # Load the page
-            driver.get(url)
+            # Load the page; if the budget runs out mid-load, keep whatever has rendered
+            driver.set_page_load_timeout(deadline.timeout(30))
+            try:
+                driver.get(url)
+            except TimeoutException:
+                driver.execute_script("window.stop();")
             
             # Wait longer for page to load
-            WebDriverWait(driver, 20).until(
+            WebDriverWait(driver, deadline.timeout(20)).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
             
             # Additional wait for dynamic content
-            time.sleep(5)
+            deadline.sleep(5)
             
             # Try to scroll to load more content
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            deadline.sleep(2)
             
             # Get page source
             page_source = driver.page_source
             
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-                element.decompose()
+            # Parse once with lxml; script/style/nav/footer/header/aside are pruned while parsing
+            doc = parse_html(page_source)
             
             # Try to find main content areas
             main_content = None
@@ -102,19 +167,17 @@ def _extract_with_selenium(url: str) -> str:
             ]
             
             for selector in content_selectors:
-                main_content = soup.select_one(selector)
-                if main_content:
+                matches = doc.cssselect(selector)
+                if matches:
+                    main_content = matches[0]
                     break
             
-            if main_content:
-                text = main_content.get_text(separator='\n', strip=True)
-            else:
+            if main_content is None:
                 # Fallback to body content
-                text = soup.body.get_text(separator='\n', strip=True) if soup.body else ""
+                main_content = doc.find('.//body')
             
             # Clean up text
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
-            cleaned_text = '\n'.join(lines)
+            cleaned_text = '\n'.join(text_lines(main_content)) if main_content is not None else ""
             
             return cleaned_text
             
@@ -127,58 +190,104 @@ def _extract_with_selenium(url: str) -> str:
     except Exception as e:
         print(f"Selenium extraction error: {e}")
         return None
-def _extract_with_requests(url: str) -> str:
-    """Extract content using requests + readability."""
+def _extract_with_requests(url: str, deadline: Deadline | None = None) -> tuple[str | None, dict]:
+    """Extract content using requests + readability; returns (text, response meta)."""
+    deadline = deadline or Deadline()
     try:
-        ssl_verify = os.getenv("SSL_VERIFY", "True").lower() == "true"
-        
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate",
-            "Connection": "keep-alive",
-            "Upgrade-Insecure-Requests": "1",
-        }
-        
-        response = requests.get(url, headers=headers, timeout=30, verify=certifi.where() if ssl_verify else False)
+        response = fetch_html(url, timeout=deadline.timeout(30), deadline=deadline)
         response.raise_for_status()
         
-        # Try readability first
-        doc = Document(response.content)
-        html_content = doc.summary()
-        soup = BeautifulSoup(html_content, 'html.parser')
-        extracted_text = soup.get_text(separator='\n', strip=True)
-        
-        if len(extracted_text) > 200:
-            return extracted_text
-        else:
-            # Fallback to basic extraction
-            return _extract_basic_fallback(response.content)
+        return _extract_readable(response.content), _response_meta(response)
             
     except Exception as e:
         print(f"Requests extraction error: {e}")
-        return None
+        return None, {}
 
-def _extract_basic(url: str) -> str:
-    """Basic extraction without readability."""
+def _extract_basic(url: str, deadline: Deadline | None = None) -> tuple[str | None, dict]:
+    """Basic extraction without readability; returns (text, response meta)."""
+    deadline = deadline or Deadline()
     try:
-        ssl_verify = os.getenv("SSL_VERIFY", "True").lower() == "true"
-        
         headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36"
+            "User-Agent": USER_AGENT
         }
         
-        response = requests.get(url, headers=headers, timeout=30, verify=certifi.where() if ssl_verify else False)
+        response = fetch_html(url, headers=headers, timeout=deadline.timeout(30), deadline=deadline)
         response.raise_for_status()
         
-        return _extract_basic_fallback(response.content)
+        return _extract_main_text(response.content), _response_meta(response)
         
     except Exception as e:
         print(f"Basic extraction error: {e}")
-        return None
+        return None, {}
+
+def _extract_readable(content: bytes) -> str:
+    """Readability extraction with a fallback for thin results, on a single pruned lxml parse."""
+    try:
+        return readable_text(parse_html(content))
+    except Exception as e:
+        print(f"Fast HTML parse failed, using html.parser: {e}")
+        return _extract_readable_legacy(content)
+
+def _extract_readable_legacy(content: bytes) -> str:
+    """Readability extraction with a BeautifulSoup fallback for thin results."""
+    # Try readability first
+    doc = Document(content)
+    html_content = doc.summary()
+    soup = BeautifulSoup(html_content, 'html.parser')
+    extracted_text = soup.get_text(separator='\n', strip=True)
+    
+    if len(extracted_text) > 200:
+        return extracted_text
+    else:
+        # Fallback to basic extraction
+        return _extract_basic_fallback_legacy(content)
+
+def _response_meta(response) -> dict:
+    """The validators and redirect target of a response, for the caller to store with the cached text."""
+    return {**get_validators(response), "final_url": response.url}
 
-def _extract_basic_fallback(content: bytes) -> str:
+def revalidate_url(url: str, etag: str | None = None, last_modified: str | None = None,
+                   deadline: Deadline | None = None) -> dict:
+    """
+    Checks a cached URL with a conditional GET.
+    Returns {"status": "not_modified" | "modified" | "error", "text", "etag", "last_modified"}.
+    On "modified" the new body is extracted directly, without another round trip.
+    """
+    if check_available(url):
+        return {"status": "error", "text": None, "etag": etag, "last_modified": last_modified}
+    try:
+        timeout = deadline.timeout(30) if deadline else 30
+        response = conditional_get(url, etag=etag, last_modified=last_modified, timeout=timeout, deadline=deadline)
+        if response.status_code == 304:
+            record_result(url, True)
+            # Some servers omit validators on 304; keep the ones we sent
+            validators = get_validators(response)
+            return {
+                "status": "not_modified",
+                "text": None,
+                "etag": validators["etag"] or etag,
+                "last_modified": validators["last_modified"] or last_modified,
+            }
+        response.raise_for_status()
+        record_result(url, True)
+        return {"status": "modified", "text": _extract_readable(response.content), "final_url": response.url,
+                **get_validators(response)}
+    except Exception as e:
+        if not (deadline and deadline.expired()):
+            # Running out of our own budget (DeadlineExceeded, or a timeout shortened to it) is not a site failure
+            record_result(url, False)
+        print(f"Revalidation error for {url}: {e}")
+        return {"status": "error", "text": None, "etag": etag, "last_modified": last_modified}
+
+def _extract_main_text(content: bytes) -> str:
+    """Main-content extraction without readability, on a single pruned lxml parse."""
+    try:
+        return main_text(parse_html(content))
+    except Exception as e:
+        print(f"Fast HTML parse failed, using html.parser: {e}")
+        return _extract_basic_fallback_legacy(content)
+
+def _extract_basic_fallback_legacy(content: bytes) -> str:
     """Basic BeautifulSoup extraction fallback."""
     soup = BeautifulSoup(content, 'html.parser')
     
@@ -203,8 +312,9 @@ def _extract_basic_fallback(content: bytes) -> str:
     lines = [line.strip() for line in text.split('\n') if line.strip() and len(line.strip()) > 3]
     return '\n'.join(lines)
 
-def extract_with_playwright(url: str) -> str:
+def extract_with_playwright(url: str, deadline: Deadline | None = None) -> str:
     """Alternative extraction using Playwright (if available)."""
+    deadline = deadline or Deadline()
     try:
         from playwright.sync_api import sync_playwright
         
@@ -212,14 +322,21 @@ def extract_with_playwright(url: str) -> str:
             browser = p.chromium.launch(headless=True)
             page = browser.new_page()
             
+            # Abort images, media, fonts and trackers before they are downloaded
+            blocked_types = blocked_types_for(url)
+            if blocked_types:
+                page.route("**/*", lambda route: route.abort()
+                           if should_block(route.request.resource_type, route.request.url, blocked_types)
+                           else route.continue_())
+            
             # Set user agent
             page.set_extra_http_headers({
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
             })
             
             # Navigate and wait
-            page.goto(url, wait_until="networkidle")
-            page.wait_for_timeout(3000)  # Wait for dynamic content
+            page.goto(url, wait_until="networkidle", timeout=deadline.timeout(30) * 1000)
+            page.wait_for_timeout(min(3000, deadline.remaining() * 1000))  # Wait for dynamic content
             
             # Extract text
             text = page.evaluate("""
@@ -0,0 +1,126 @@
+# services/http_client.py
+
+import os
+import threading
+import certifi
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from utils.html_text import trim_partial_utf8
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36"
+
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    # Includes br (and zstd) only when the matching decoder package is installed
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+# Decoded bytes kept from one page; anything beyond is dropped and the download stops
+MAX_DOWNLOAD_BYTES = int(os.getenv("MAX_DOWNLOAD_BYTES", str(5 * 1024 * 1024)))
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+_CHUNK_SIZE = 64 * 1024
+
+class DownloadError(Exception):
+    """Raised when a download is refused before its body is read."""
+
+class FetchedPage:
+    """The parts of a response the extractors use, with a body read under a size cap."""
+
+    def __init__(self, status_code: int, url: str, headers, content: bytes, truncated: bool = False):
+        self.status_code = status_code
+        self.url = url
+        self.headers = headers
+        self.content = content
+        self.truncated = truncated
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error for url: {self.url}")
+
+_session = None
+_session_lock = threading.Lock()
+
+def ssl_verify_setting():
+    """Returns the `verify` argument for requests based on the SSL_VERIFY setting."""
+    ssl_verify = os.getenv("SSL_VERIFY", "True").lower() == "true"
+    return certifi.where() if ssl_verify else False
+
+def get_session() -> requests.Session:
+    """
+    Returns the process-wide HTTP session, creating it on first use.
+    Connections are kept alive and pooled per host, so repeated fetches
+    from the same portal skip the TCP and TLS handshakes.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=int(os.getenv("HTTP_POOL_HOSTS", "32")),
+                    pool_maxsize=int(os.getenv("HTTP_POOL_PER_HOST", "4")),
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _session = session
+    return _session
+
+def get_validators(response) -> dict:
+    """Extracts the cache validators (ETag / Last-Modified) from a response."""
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+def fetch_html(url: str, headers: dict | None = None, timeout: float = 30, deadline=None,
+               max_bytes: int = MAX_DOWNLOAD_BYTES) -> FetchedPage:
+    """
+    Streams a page instead of buffering the whole response.
+
+    - Responses that declare a non-HTML Content-Type are refused before the
+      body is read, so a mislinked PDF or video costs only its headers.
+    - The body is decompressed chunk by chunk and kept up to `max_bytes`;
+      the rest is never downloaded. lxml copes with the cut-off markup.
+    - If a `deadline` is given, reading stops once it passes and the partial page is kept.
+    """
+    response = get_session().get(url, headers=headers, timeout=timeout, verify=ssl_verify_setting(), stream=True)
+    try:
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if response.status_code < 300 and content_type and content_type not in HTML_CONTENT_TYPES:
+            raise DownloadError(f"Not an HTML page ({content_type})")
+
+        chunks = []
+        size = 0
+        truncated = False
+        for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > max_bytes or (deadline is not None and deadline.expired()):
+                truncated = True
+                break
+        content = b"".join(chunks)
+        if truncated:
+            content = trim_partial_utf8(content[:max_bytes])
+        return FetchedPage(response.status_code, response.url, response.headers, content, truncated)
+    finally:
+        # Closing mid-body drops the connection instead of draining the rest of a huge page
+        response.close()
+
+def conditional_get(url: str, etag: str | None = None, last_modified: str | None = None, timeout: float = 30,
+                    deadline=None) -> FetchedPage:
+    """
+    Issues a GET that the server may answer with 304 Not Modified when the
+    cached copy identified by `etag` / `last_modified` is still current.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return fetch_html(url, headers=headers, timeout=timeout, deadline=deadline)
@@ -0,0 +1,62 @@
+# services/metrics_server.py
+"""
+HTTP routes exposing cache metrics (see utils/cache_metrics.py), mounted next
+to the Streamlit app by server.py:
+
+  /metrics       Prometheus text exposition format
+  /metrics.json  the same data as JSON
+
+Both, and the admin page (?page=cache), need CACHE_ADMIN_TOKEN: as a bearer
+token (Authorization: Bearer <token>) or a ?token= query parameter. They stay
+disabled while it is unset.
+"""
+
+import hmac
+import os
+import sqlite3
+from utils.cache_metrics import to_prometheus
+from utils.db_cache import get_cache_stats
+
+CACHE_ADMIN_TOKEN = os.getenv("CACHE_ADMIN_TOKEN", "")
+
+def is_authorized(token: str | None) -> bool:
+    """True if `token` matches CACHE_ADMIN_TOKEN; always False while that is unset."""
+    return bool(CACHE_ADMIN_TOKEN) and bool(token) and hmac.compare_digest(token.encode(), CACHE_ADMIN_TOKEN.encode())
+
+def _request_token(request) -> str | None:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer":
+        return token.strip()
+    return request.query_params.get("token")
+
+def _stats_or_error(request):
+    from starlette.responses import PlainTextResponse
+
+    if not is_authorized(_request_token(request)):
+        return None, PlainTextResponse("Forbidden", status_code=403)
+    try:
+        return get_cache_stats(), None
+    except sqlite3.Error as e:
+        # The schema is created when the first session starts
+        return None, PlainTextResponse(f"Cache database not ready: {e}", status_code=503)
+
+def serve_metrics(request):
+    from starlette.responses import PlainTextResponse
+
+    stats, error = _stats_or_error(request)
+    return error or PlainTextResponse(to_prometheus(stats), media_type="text/plain; version=0.0.4")
+
+def serve_metrics_json(request):
+    from starlette.responses import JSONResponse
+
+    stats, error = _stats_or_error(request)
+    return error or JSONResponse(stats)
+
+def metrics_routes() -> list:
+    """The Starlette routes to mount alongside the Streamlit app."""
+    from starlette.routing import Route
+
+    return [
+        Route("/metrics", serve_metrics, methods=["GET"]),
+        Route("/metrics.json", serve_metrics_json, methods=["GET"]),
+    ]
@@ -0,0 +1,65 @@
+# services/pdf_server.py
+"""
+HTTP route that serves the summary PDFs in the shared directory, mounted next
+to the Streamlit app by server.py.
+
+Browsers and messaging apps fetch the PDF straight from this route instead of
+the app pushing its bytes over the websocket on every rerun. Responses carry
+an ETag and Last-Modified (answered with 304 when unchanged), support Range
+requests, and may be cached: summary PDFs are content-addressed, so a name
+always refers to the same summary.
+"""
+
+import os
+import re
+from utils.pdf_store import touch
+
+SHARED_DIR = os.getenv("SHARED_DIR", "shared")
+SHARED_PDF_ROUTE = "/shared"
+PDF_CACHE_MAX_AGE = int(os.getenv("PDF_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+
+_PDF_NAME = re.compile(r"summary-[A-Za-z0-9-]+\.pdf")
+_routes_mounted = False
+
+def shared_pdf_url(pdf_path: str, base_url: str = "") -> str:
+    """URL under which a PDF in the shared directory is served; relative unless `base_url` is given."""
+    return f"{base_url.rstrip('/')}{SHARED_PDF_ROUTE}/{os.path.basename(pdf_path)}"
+
+def routes_mounted() -> bool:
+    """True if this process serves the shared PDF route (the app was started through server.py)."""
+    return _routes_mounted
+
+async def serve_shared_pdf(request):
+    from starlette.responses import FileResponse, Response
+
+    name = request.path_params["name"]
+    path = os.path.join(SHARED_DIR, name)
+    if not _PDF_NAME.fullmatch(name) or not os.path.isfile(path):
+        return Response("Not found", status_code=404, media_type="text/plain")
+
+    touch(path)  # Keeps PDFs people still open out of the quota's eviction
+    stat = os.stat(path)
+    response = FileResponse(
+        path,
+        media_type="application/pdf",
+        stat_result=stat,
+        headers={
+            "Cache-Control": f"public, max-age={PDF_CACHE_MAX_AGE}",
+            "Content-Disposition": f'inline; filename="{name}"',
+        },
+    )
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and response.headers["etag"] in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={
+            "ETag": response.headers["etag"],
+            "Cache-Control": response.headers["cache-control"],
+        })
+    return response
+
+def shared_pdf_routes() -> list:
+    """The Starlette routes to mount alongside the Streamlit app."""
+    from starlette.routing import Route
+
+    global _routes_mounted
+    _routes_mounted = True
+    return [Route(f"{SHARED_PDF_ROUTE}/{{name}}", serve_shared_pdf, methods=["GET", "HEAD"])]
@@ -0,0 +1,71 @@
+# services/resource_blocking.py
+
+import os
+from urllib.parse import urlsplit
+
+# Only visible text is extracted, so these never need to load. Stylesheets are
+# kept: innerText depends on CSS (display:none) and some portals reveal content with it.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "tracker"}
+
+RESOURCE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "svg", "ico", "bmp", "avif"),
+    "media": ("mp4", "webm", "mp3", "ogg", "wav", "m4a", "avi", "mov", "m3u8"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+}
+
+TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "connect.facebook.com", "hotjar.com", "clarity.ms", "scorecardresearch.com",
+    "addthis.com", "sharethis.com", "statcounter.com",
+)
+
+def _host(url: str) -> str:
+    return urlsplit(url).hostname or ""
+
+def _allow_list() -> dict:
+    """
+    Parses BROWSER_BLOCK_ALLOWLIST, e.g. "pmkisan.gov.in=font|image,example.gov.in=*".
+    Each domain maps to the resource types that must load on it ("*" disables blocking).
+    """
+    allow = {}
+    for entry in os.getenv("BROWSER_BLOCK_ALLOWLIST", "").split(","):
+        domain, _, types = entry.strip().partition("=")
+        if domain:
+            allow[domain.lower()] = set((types or "*").split("|"))
+    return allow
+
+def blocked_types_for(page_url: str) -> set:
+    """Returns the resource types to abort for a page, after applying the per-domain allow-list."""
+    if os.getenv("BROWSER_BLOCK_RESOURCES", "True").lower() != "true":
+        return set()
+    host = _host(page_url).lower()
+    blocked = set(BLOCKED_RESOURCE_TYPES)
+    for domain, allowed in _allow_list().items():
+        if host == domain or host.endswith("." + domain):
+            if "*" in allowed:
+                return set()
+            blocked -= allowed
+    return blocked
+
+def is_tracker(request_url: str) -> bool:
+    host = _host(request_url).lower()
+    return any(host == t or host.endswith("." + t) for t in TRACKER_HOSTS)
+
+def should_block(resource_type: str, request_url: str, blocked_types: set) -> bool:
+    """Decides whether a browser request should be aborted (Playwright resource types)."""
+    if "tracker" in blocked_types and is_tracker(request_url):
+        return True
+    return resource_type in blocked_types
+
+def selenium_blocked_url_patterns(page_url: str) -> list[str]:
+    """URL patterns for Chrome's Network.setBlockedURLs, which matches on URLs rather than types."""
+    blocked = blocked_types_for(page_url)
+    patterns = []
+    for resource_type, extensions in RESOURCE_EXTENSIONS.items():
+        if resource_type in blocked:
+            for ext in extensions:
+                # Anchor on the end of the path so hosts like "www.icon.gov.in" never match
+                patterns.extend((f"*.{ext}", f"*.{ext}?*"))
+    if "tracker" in blocked:
+        patterns.extend(f"*://*{host}/*" for host in TRACKER_HOSTS)
+    return patterns
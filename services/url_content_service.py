@@ -0,0 +1,98 @@
+# services/url_content_service.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from services.html_extract_service import extract_url, revalidate_url
+from utils.deadline import Deadline
+from utils.db_cache import get_url_cache_entry, save_url_cache, touch_url_cache, url_cache_state
+from utils.logger import logger
+from utils.url_utils import canonicalize_url
+
+URL_REFRESH_WORKERS = int(os.getenv("URL_REFRESH_WORKERS", "2"))
+
+_refresh_executor = ThreadPoolExecutor(max_workers=URL_REFRESH_WORKERS, thread_name_prefix="url-refresh")
+_refreshing = set()  # Canonical URLs with a background refresh queued or running
+_refreshing_lock = threading.Lock()
+
+def get_url_content(url: str, deadline: Deadline | None = None) -> dict:
+    """
+    Returns the text for a URL, using the url_cache where possible
+    (stale-while-revalidate, with soft and hard TTLs per domain):
+
+    - within the soft TTL the cached text is served directly;
+    - past the soft TTL but within the hard TTL it is still served, and a
+      background refresh brings the entry up to date for the next request;
+    - past the hard TTL the entry is revalidated with a conditional GET
+      before answering, so an unchanged page costs a 304 instead of a full
+      re-extraction. Only misses run the whole extraction chain.
+
+    Revalidation and extraction share one `deadline`, which bounds the whole
+    call (EXTRACTION_DEADLINE_SECONDS by default).
+
+    URLs that failed moments ago, or whose domain is failing, come back
+    straight away as "unavailable" with a message saying when to retry.
+
+    Returns {"text": str, "source": "cache" | "stale" | "revalidated" | "extracted" | "unavailable" | "error"}.
+    """
+    deadline = deadline or Deadline()
+    logger.info(f"URL requested: {url}")
+    entry = get_url_cache_entry(url)
+    if entry and entry.has_value("content"):
+        state = url_cache_state(entry)
+        if state == "fresh":
+            return {"text": entry["content"], "source": "cache"}
+        if state == "stale":
+            refresh_in_background(url, entry)
+            return {"text": entry["content"], "source": "stale"}
+
+        result = _revalidate(url, entry, deadline)
+        if result:
+            return result
+    return _extract(url, deadline)
+
+def refresh_in_background(url: str, entry: dict) -> bool:
+    """Queues a refresh of a cached URL unless one is already pending; returns True if queued."""
+    key = canonicalize_url(url)
+    with _refreshing_lock:
+        if key in _refreshing:
+            return False
+        _refreshing.add(key)
+    _refresh_executor.submit(_refresh, url, key, entry)
+    return True
+
+def _refresh(url: str, key: str, entry: dict):
+    try:
+        deadline = Deadline()
+        result = _revalidate(url, entry, deadline) or _extract(url, deadline)
+        logger.info(f"Background refresh of {url}: {result['source']}")
+    except Exception as e:
+        logger.error(f"Background refresh of {url} failed: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+def _revalidate(url: str, entry: dict, deadline: Deadline) -> dict | None:
+    """Revalidates a cached entry; returns the result, or None if the page needs a full extraction."""
+    result = revalidate_url(url, entry.get("etag"), entry.get("last_modified"), deadline=deadline)
+    if result["status"] == "not_modified":
+        touch_url_cache(url, result["etag"], result["last_modified"])
+        return {"text": entry["content"], "source": "revalidated"}
+    if result["status"] == "modified" and result["text"] and len(result["text"]) > 200:
+        save_url_cache(url, result["text"], result["etag"], result["last_modified"], final_url=result["final_url"])
+        return {"text": result["text"], "source": "extracted"}
+    if result["status"] == "error":
+        # The portal is unreachable right now; stale text beats no text
+        logger.warning(f"Revalidation failed, serving stale cached content for: {url}")
+        return {"text": entry["content"], "source": "cache"}
+    return None
+
+def _extract(url: str, deadline: Deadline) -> dict:
+    result = extract_url(url, deadline=deadline)
+    text = result["text"]
+    if result.get("unavailable"):
+        return {"text": text, "source": "unavailable"}
+    if text and not text.startswith("Error:"):
+        save_url_cache(url, text, result["etag"], result["last_modified"], final_url=result["final_url"])
+        return {"text": text, "source": "extracted"}
+    return {"text": text or "", "source": "error"}
@@ -0,0 +1,183 @@
+# utils/cache_backends.py
+"""
+Shared cache tier for running several app replicas.
+
+Each replica keeps its own cache database (CACHE_DB_PATH); when
+CACHE_SHARED_BACKEND is set, lookups that miss locally fall through to a
+backend all replicas share, and new entries are written to it as well:
+
+  sqlite:///var/cache/ai-sahayak/shared.db   a database file processes on one host share (WAL mode)
+  http://cache-host:8765                     a cache server (python -m services.cache_server)
+
+Backends store records, the column values of a cache row with payloads
+still encoded (see utils/cache_codec.py), under keys built by cache_key()
+so every replica and backend agrees on them.
+"""
+
+import base64
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import quote
+from utils.logger import logger
+
+CACHE_SHARED_BACKEND = os.getenv("CACHE_SHARED_BACKEND", "")
+CACHE_BACKEND_TIMEOUT = float(os.getenv("CACHE_BACKEND_TIMEOUT", "0.5"))
+# Shared secret the cache server requires for writes; replicas send it as a bearer token
+CACHE_SHARED_TOKEN = os.getenv("CACHE_SHARED_TOKEN", "")
+# Bump when the record layout changes, so replicas on different versions never read each other's records
+KEY_VERSION = "v1"
+
+def cache_key(namespace: str, key: str) -> str:
+    """The backend key for a cache entry, e.g. namespace "summary" and a source_key, or "url" and a canonical URL."""
+    return f"{KEY_VERSION}/{namespace}/{hashlib.sha256(key.encode()).hexdigest()}"
+
+def encode_record(record: dict) -> bytes:
+    """Serializes a record; bytes values (encoded payloads) are base64-wrapped."""
+    return json.dumps({
+        name: {"b64": base64.b64encode(value).decode()} if isinstance(value, bytes) else value
+        for name, value in record.items()
+    }).encode()
+
+def decode_record(data: bytes) -> dict:
+    return {
+        name: base64.b64decode(value["b64"]) if isinstance(value, dict) else value
+        for name, value in json.loads(data).items()
+    }
+
+class CacheBackend(ABC):
+    """A key-value store for cache records. Failures are logged and behave as misses."""
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> dict | None:
+        """The record stored under a key, or None."""
+
+    @abstractmethod
+    def put(self, namespace: str, key: str, record: dict):
+        """Stores a record, replacing any record under the same key."""
+
+    @abstractmethod
+    def expire(self, max_age_seconds: float) -> int:
+        """Deletes records written more than `max_age_seconds` ago; returns how many."""
+
+class SQLiteBackend(CacheBackend):
+    """Records in a SQLite file; any number of processes on one host can share it."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS shared_cache (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    timestamp REAL NOT NULL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_shared_cache_timestamp ON shared_cache (timestamp)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_raw(self, key: str) -> bytes | None:
+        row = self._connection().execute("SELECT value FROM shared_cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put_raw(self, key: str, value: bytes):
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO shared_cache (key, value, timestamp) VALUES (?, ?, ?)",
+                         (key, value, time.time()))
+
+    def delete_raw(self, key: str):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM shared_cache WHERE key = ?", (key,))
+
+    def expire(self, max_age_seconds):
+        try:
+            with self._connection() as conn:
+                return conn.execute("DELETE FROM shared_cache WHERE timestamp < ?", (time.time() - max_age_seconds,)).rowcount
+        except Exception as e:
+            logger.error(f"Shared cache expiry failed ({self.path}): {e}")
+            return 0
+
+    def get(self, namespace, key):
+        try:
+            value = self.get_raw(cache_key(namespace, key))
+            return decode_record(value) if value is not None else None
+        except Exception as e:
+            logger.error(f"Shared cache read failed ({self.path}): {e}")
+            return None
+
+    def put(self, namespace, key, record):
+        try:
+            self.put_raw(cache_key(namespace, key), encode_record(record))
+        except Exception as e:
+            logger.error(f"Shared cache write failed ({self.path}): {e}")
+
+class HttpBackend(CacheBackend):
+    """Records on a cache server over HTTP (GET/PUT/DELETE /cache/<key>), with keep-alive connections."""
+
+    name = "http"
+
+    def __init__(self, base_url: str, timeout: float = CACHE_BACKEND_TIMEOUT, token: str = CACHE_SHARED_TOKEN):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.token = token
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+            session = self._local.session = requests.Session()
+            if self.token:
+                session.headers["Authorization"] = f"Bearer {self.token}"
+        return session
+
+    def _url(self, namespace: str, key: str) -> str:
+        return f"{self.base_url}/cache/{quote(cache_key(namespace, key))}"
+
+    def get(self, namespace, key):
+        try:
+            response = self._session().get(self._url(namespace, key), timeout=self.timeout)
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return decode_record(response.content)
+        except Exception as e:
+            logger.error(f"Shared cache read failed ({self.base_url}): {e}")
+            return None
+
+    def put(self, namespace, key, record):
+        try:
+            self._session().put(self._url(namespace, key), data=encode_record(record), timeout=self.timeout).raise_for_status()
+        except Exception as e:
+            logger.error(f"Shared cache write failed ({self.base_url}): {e}")
+
+    def expire(self, max_age_seconds):
+        return 0  # The cache server expires its records itself (--days-old)
+
+def create_backend(spec: str) -> CacheBackend | None:
+    """Builds a backend from a CACHE_SHARED_BACKEND value; None for an empty spec."""
+    if not spec:
+        return None
+    if spec.startswith("sqlite://"):
+        return SQLiteBackend(spec[len("sqlite://"):])
+    if spec.startswith(("http://", "https://")):
+        return HttpBackend(spec)
+    raise ValueError(f"Unknown cache backend: {spec}")
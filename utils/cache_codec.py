@@ -0,0 +1,66 @@
+# utils/cache_codec.py
+"""
+Compression for cached payloads (url_cache.content, scheme_cache.summary_en/te).
+
+Every row records the format its payload columns were written in, so the
+encoding can change without rewriting old rows:
+
+  0  plain TEXT (rows written before compression existed)
+  1  zlib with SUMMARY_ZDICT_V1 as preset dictionary
+
+The preset dictionary holds the headings and phrases every summary and most
+portal pages repeat, in English and Telugu, so even a short summary compresses
+well. Never edit a dictionary once rows use it: add a new format instead.
+"""
+
+import os
+import zlib
+
+FORMAT_TEXT = 0
+FORMAT_ZLIB_V1 = 1
+
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "true").lower() == "true"
+CACHE_COMPRESSION_LEVEL = int(os.getenv("CACHE_COMPRESSION_LEVEL", "6"))
+
+# zlib favours matches near the end of the dictionary, so the most common phrases come last
+SUMMARY_ZDICT_V1 = "\n".join([
+    "Government of India Ministry of Department of State Government official website",
+    "Home About Us Contact Us Sitemap Screen Reader Access Skip to main content Disclaimer Privacy Policy",
+    "Terms and Conditions Copyright Website Policies Help Feedback Last Updated",
+    "Pradhan Mantri Yojana Scheme Mission Programme Abhiyan National Rural Urban",
+    "beneficiaries financial assistance Direct Benefit Transfer (DBT) PFMS Aadhaar bank account",
+    "Below Poverty Line (BPL) Scheduled Castes Scheduled Tribes Other Backward Classes women farmers",
+    "Gram Panchayat Common Service Centre (CSC) online portal application form",
+    "Required documents: Aadhaar card, ration card, income certificate, caste certificate, "
+    "residence proof, bank passbook, passport size photograph",
+    "పథకం ప్రభుత్వం లబ్ధిదారులు ఆర్థిక సహాయం ఆధార్ కార్డు బ్యాంకు ఖాతా దరఖాస్తు ఫారం పత్రాలు",
+    "సంవత్సరాలు వయస్సు రూపాయలు నెలకు సంవత్సరానికి మహిళలు రైతులు గ్రామ పంచాయతీ",
+    "1. ** అర్హత **\n2. ** ప్రయోజనాలు **\n3. ** ఎలా దరఖాస్తు చేయాలి **\n4. ** అదనపు సమాచారం **\n   - ",
+    "Consolidated Summary: Scheme objectives Implementing ministry/department "
+    "Helpline or grievance redressal mechanism Not specified.",
+    "Who can apply (age, gender, income, occupation) Financial benefits and assistance amounts "
+    "Application steps Where to apply Approval and disbursement process",
+    "1. **Eligibility**\n2. **Benefits**\n3. **How to Apply**\n4. **Additional Information**\n   - ",
+]).encode()
+
+def current_format() -> int:
+    """The format new rows are written in."""
+    return FORMAT_ZLIB_V1 if CACHE_COMPRESSION else FORMAT_TEXT
+
+def encode(text: str | None, fmt: int) -> str | bytes | None:
+    """Encodes a payload for storage in the given format."""
+    if text is None or fmt == FORMAT_TEXT:
+        return text
+    if fmt == FORMAT_ZLIB_V1:
+        compressor = zlib.compressobj(CACHE_COMPRESSION_LEVEL, zdict=SUMMARY_ZDICT_V1)
+        return compressor.compress(text.encode()) + compressor.flush()
+    raise ValueError(f"Unknown cache payload format: {fmt}")
+
+def decode(value: str | bytes | None, fmt: int) -> str | None:
+    """Decodes a stored payload written in the given format."""
+    if value is None or fmt == FORMAT_TEXT:
+        return value
+    if fmt == FORMAT_ZLIB_V1:
+        decompressor = zlib.decompressobj(zdict=SUMMARY_ZDICT_V1)
+        return (decompressor.decompress(value) + decompressor.flush()).decode()
+    raise ValueError(f"Unknown cache payload format: {fmt}")
@@ -0,0 +1,132 @@
+# utils/cache_metrics.py
+"""
+Per-cache counters and lookup latency histograms for utils/db_cache.py,
+plus rendering in the Prometheus text exposition format.
+
+Counters live in the process, so they restart with the server and each
+process reports its own.
+"""
+
+import bisect
+import functools
+import threading
+import time
+
+# Upper bounds in seconds, Prometheus-style (each bucket counts lookups at or under its bound)
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+class CacheMetrics:
+    """Lookup outcomes, latency and expiry counts for one cache."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)  # Last slot is +Inf
+        self.latency_sum = 0.0
+        self.memory_tier = None  # The ByteLRUCache in front of this cache, if any
+
+    def observe(self, hit: bool, seconds: float):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.latency_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self.latency_sum += seconds
+
+    def add_expired(self, rows: int):
+        with self._lock:
+            self.expired += rows
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "expired": self.expired,
+                "latency": {
+                    "buckets": dict(zip([*LATENCY_BUCKETS, "+Inf"], self.latency_counts)),
+                    "sum_seconds": self.latency_sum,
+                    "count": lookups,
+                },
+            }
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+def get_metrics(name: str) -> CacheMetrics:
+    """The process-wide metrics for a cache, created on first use."""
+    with _metrics_lock:
+        if name not in _metrics:
+            _metrics[name] = CacheMetrics(name)
+        return _metrics[name]
+
+def instrumented(name: str):
+    """Decorates a cache lookup: times it and counts a hit unless it returns None."""
+    metrics = get_metrics(name)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            metrics.observe(result is not None, time.perf_counter() - started)
+            return result
+        return wrapper
+    return decorator
+
+def latency_quantile(latency: dict, q: float) -> float | None:
+    """Upper bound of the histogram bucket holding the q-th quantile (seconds), or None without lookups."""
+    if not latency["count"]:
+        return None
+    rank = q * latency["count"]
+    cumulative = 0
+    for bound, count in latency["buckets"].items():
+        cumulative += count
+        if cumulative >= rank:
+            return float("inf") if bound == "+Inf" else bound
+    return float("inf")
+
+def to_prometheus(stats: dict) -> str:
+    """Renders get_cache_stats() output in the Prometheus text exposition format."""
+    series = {
+        "cache_hits_total": ("counter", "Cache lookups that found an entry."),
+        "cache_misses_total": ("counter", "Cache lookups that found nothing."),
+        "cache_expired_total": ("counter", "Rows removed by expiry."),
+        "cache_entries": ("gauge", "Rows stored in SQLite."),
+        "cache_bytes": ("gauge", "Payload bytes stored in SQLite."),
+        "cache_memory_entries": ("gauge", "Entries in the in-process tier."),
+        "cache_memory_bytes": ("gauge", "Bytes held by the in-process tier."),
+        "cache_memory_evictions_total": ("counter", "Entries evicted from the in-process tier to stay within budget."),
+    }
+    values = {metric: [] for metric in series}
+    lines = []
+    for cache, s in stats.items():
+        label = f'cache="{cache}"'
+        values["cache_hits_total"].append((label, s["hits"]))
+        values["cache_misses_total"].append((label, s["misses"]))
+        values["cache_expired_total"].append((label, s["expired"]))
+        values["cache_entries"].append((label, s["entries"]))
+        values["cache_bytes"].append((label, s["bytes"]))
+        if s.get("memory"):
+            values["cache_memory_entries"].append((label, s["memory"]["entries"]))
+            values["cache_memory_bytes"].append((label, s["memory"]["bytes"]))
+            values["cache_memory_evictions_total"].append((label, s["memory"]["evictions"]))
+    for metric, (kind, help_text) in series.items():
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        lines += [f"{metric}{{{label}}} {value}" for label, value in values[metric]]
+
+    lines += ["# HELP cache_lookup_seconds Cache lookup latency.", "# TYPE cache_lookup_seconds histogram"]
+    for cache, s in stats.items():
+        cumulative = 0
+        for bound, count in s["latency"]["buckets"].items():
+            cumulative += count
+            lines.append(f'cache_lookup_seconds_bucket{{cache="{cache}",le="{bound}"}} {cumulative}')
+        lines.append(f'cache_lookup_seconds_sum{{cache="{cache}"}} {s["latency"]["sum_seconds"]}')
+        lines.append(f'cache_lookup_seconds_count{{cache="{cache}"}} {s["latency"]["count"]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,195 @@
+# utils/cache_snapshot.py
+"""
+Cache snapshots, so a new replica starts warm instead of paying for every
+popular scheme again.
+
+A snapshot is a tar.gz bundle:
+
+  manifest.json   snapshot id, base id (deltas), per-table watermarks, sha256 and size of every file
+  cache.db        consistent copy of the cache database (SQLite online backup), search index included
+  shared/<pdf>    the summary PDFs its rows point to
+
+A full snapshot holds every row; a delta (export --base <earlier bundle>)
+only rows written since the base's watermarks, and their PDFs.
+
+With CACHE_SNAPSHOT set to a bundle or a directory of bundles, the app imports
+the bundles it has not applied yet when it starts. Every file is checked
+against the manifest first. On an empty replica a full snapshot's database is
+copied in as is (online backup, safe while the app runs); otherwise rows are merged (newest URL entry wins,
+existing summaries are kept), so bundles can be applied in any order.
+
+Usage:
+    python -m utils.cache_snapshot export [--base snapshots/<bundle>.tar.gz] [--out-dir snapshots] [--shared-dir shared]
+    python -m utils.cache_snapshot import snapshots/ [--shared-dir shared]
+"""
+
+import argparse
+import datetime
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tarfile
+import tempfile
+import time
+import utils.db_cache as db_cache
+from utils.logger import logger
+
+CACHE_SNAPSHOT = os.getenv("CACHE_SNAPSHOT", "")
+SNAPSHOT_FORMAT = 1
+# Tables copied by a snapshot; deltas keep rows from the base's watermark on (rows already present are skipped on import)
+SNAPSHOT_TABLES = ("scheme_cache", "url_cache", "url_alias", "pdf_page_cache")
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_manifest(bundle_path: str) -> dict:
+    with tarfile.open(bundle_path, "r:gz") as bundle:
+        return json.load(bundle.extractfile("manifest.json"))
+
+def export_snapshot(out_dir: str, shared_dir: str, base: str | None = None) -> str:
+    """Writes a full snapshot, or a delta against the `base` bundle, to `out_dir`; returns the bundle path."""
+    base_manifest = read_manifest(base) if base else None
+    kind = "delta" if base_manifest else "full"
+    os.makedirs(out_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=out_dir) as tmp:
+        db_path = os.path.join(tmp, "cache.db")
+        db_cache.backup_cache_db(db_path)
+
+        snapshot = sqlite3.connect(db_path)
+        with snapshot:
+            watermarks = {table: snapshot.execute(f"SELECT MAX(timestamp) FROM {table}").fetchone()[0]
+                          for table in SNAPSHOT_TABLES}
+            if base_manifest:
+                for table in SNAPSHOT_TABLES:
+                    if base_manifest["watermarks"].get(table) is not None:
+                        snapshot.execute(f"DELETE FROM {table} WHERE timestamp < ?", (base_manifest["watermarks"][table],))
+                # A delta is merged row by row, which rebuilds the index entries
+                snapshot.execute("DROP TABLE IF EXISTS search_index")
+                snapshot.execute("DROP TABLE IF EXISTS search_docs")
+            pdf_paths = {row[0] for row in snapshot.execute("SELECT pdf_path FROM scheme_cache WHERE pdf_path IS NOT NULL")}
+        if base_manifest:
+            snapshot.execute("VACUUM")
+        snapshot.close()
+
+        members = {"cache.db": db_path}
+        for pdf_path in pdf_paths:
+            path = os.path.join(shared_dir, os.path.basename(pdf_path))
+            if os.path.exists(path):
+                members[f"shared/{os.path.basename(path)}"] = path
+        files = {name: {"sha256": _sha256(path), "size": os.path.getsize(path)} for name, path in members.items()}
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "id": hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()[:16],
+            "kind": kind,
+            "base": base_manifest["id"] if base_manifest else None,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "watermarks": watermarks,
+            "files": files,
+        }
+        manifest_path = os.path.join(tmp, "manifest.json")
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        bundle_path = os.path.join(out_dir, f"cache-snapshot-{time.strftime('%Y%m%dT%H%M%S')}-{kind}-{manifest['id']}.tar.gz")
+        tmp_bundle = os.path.join(tmp, "bundle.tar.gz")
+        with tarfile.open(tmp_bundle, "w:gz", compresslevel=6) as bundle:
+            bundle.add(manifest_path, "manifest.json")
+            for name, path in members.items():
+                bundle.add(path, name)
+        os.replace(tmp_bundle, bundle_path)
+    logger.info(f"Exported {kind} cache snapshot {manifest['id']} to {bundle_path} ({len(members) - 1} PDFs).")
+    return bundle_path
+
+def _unpack(bundle_path: str, dest: str) -> dict:
+    """Extracts a bundle into `dest` and checks every file against the manifest; returns the manifest."""
+    with tarfile.open(bundle_path, "r:gz") as bundle:
+        bundle.extractall(dest, filter="data")
+    with open(os.path.join(dest, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {manifest.get('format')} in {bundle_path}")
+    for name, expected in manifest["files"].items():
+        path = os.path.join(dest, name)
+        if not os.path.isfile(path) or os.path.getsize(path) != expected["size"] or _sha256(path) != expected["sha256"]:
+            raise ValueError(f"Checksum mismatch for {name} in {bundle_path}")
+    return manifest
+
+def import_snapshot(bundle_path: str, shared_dir: str) -> dict | None:
+    """
+    Imports one bundle into the cache database and `shared_dir`; returns what was
+    done, or None if the bundle was applied before. Raises ValueError if a file
+    does not match its checksum, before anything is changed.
+    """
+    started = time.perf_counter()
+    db_cache.init_db()
+    manifest = read_manifest(bundle_path)
+    applied = db_cache.applied_snapshots()
+    if manifest["id"] in applied:
+        return None
+    if manifest["base"] and manifest["base"] not in applied:
+        # Merging stays correct; rows only in the missing bundles are simply absent
+        logger.warning(f"Snapshot {manifest['id']} is a delta on {manifest['base']}, which was never imported.")
+
+    db_dir = os.path.dirname(os.path.abspath(db_cache.DB_NAME))
+    with tempfile.TemporaryDirectory(dir=db_dir) as tmp:
+        _unpack(bundle_path, tmp)
+        os.makedirs(shared_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(tmp, "shared", "*.pdf")):
+            shutil.move(path, os.path.join(shared_dir, os.path.basename(path)))
+
+        empty = manifest["kind"] == "full" and db_cache.is_cache_empty()
+        if empty:
+            # Nothing to keep: take the snapshot's database, index and all, as is
+            db_cache.restore_cache_db(os.path.join(tmp, "cache.db"))
+            db_cache.init_db()
+            db_cache.rebase_pdf_paths(shared_dir)
+            counts = {"database": "replaced"}
+        else:
+            counts = db_cache.merge_cache_db(os.path.join(tmp, "cache.db"), shared_dir)
+    db_cache.record_snapshot(manifest["id"], manifest["kind"], manifest["base"])
+    elapsed = time.perf_counter() - started
+    logger.info(f"Imported {manifest['kind']} cache snapshot {manifest['id']} in {elapsed:.2f}s: {counts}")
+    return {"id": manifest["id"], "kind": manifest["kind"], "seconds": elapsed, "rows": counts}
+
+def import_snapshots(path: str, shared_dir: str) -> list[dict]:
+    """Imports a bundle, or every bundle in a directory in name order; bad bundles are logged and skipped."""
+    bundles = sorted(glob.glob(os.path.join(path, "*.tar.gz"))) if os.path.isdir(path) else [path]
+    results = []
+    for bundle_path in bundles:
+        try:
+            result = import_snapshot(bundle_path, shared_dir)
+            if result:
+                results.append(result)
+        except Exception as e:
+            logger.error(f"Could not import cache snapshot {bundle_path}: {e}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import cache snapshots for bootstrapping replicas.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Write a full snapshot, or a delta with --base")
+    export.add_argument("--base", help="Earlier bundle to build a delta against")
+    export.add_argument("--out-dir", default="snapshots")
+    export.add_argument("--shared-dir", default="shared")
+    imp = sub.add_parser("import", help="Import a bundle or a directory of bundles")
+    imp.add_argument("path")
+    imp.add_argument("--shared-dir", default="shared")
+    args = parser.parse_args()
+
+    db_cache.init_db()
+    if args.command == "export":
+        bundle_path = export_snapshot(args.out_dir, args.shared_dir, args.base)
+        print(f"{bundle_path} ({os.path.getsize(bundle_path) / 1024:.1f} KiB)")
+    else:
+        for result in import_snapshots(args.path, args.shared_dir):
+            print(f"{result['kind']} {result['id']}: {result['rows']} in {result['seconds']:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -4,116 +4,818 @@ import sqlite3
 import hashlib
 import os
 import datetime
+import threading
+import time
+from collections.abc import Mapping
+from functools import lru_cache
+from urllib.parse import urlsplit
+from utils import cache_codec, search_index
+from utils.cache_backends import CACHE_SHARED_BACKEND, create_backend
+from utils.cache_metrics import get_metrics, instrumented
 from utils.logger import logger
+from utils.lru_cache import ByteLRUCache
+from utils.url_utils import canonicalize_url
 
-DB_NAME = "cache.db"
+# Each replica keeps its own database; set a distinct path per replica when several share a host
+DB_NAME = os.getenv("CACHE_DB_PATH", "cache.db")
+# Rows older than this are expired by utils/maintenance.py, and not copied back in from the shared tier
+CACHE_MAX_AGE_DAYS = float(os.getenv("CACHE_MAX_AGE_DAYS", "7"))
+URL_CACHE_TTL_HOURS = float(os.getenv("URL_CACHE_TTL_HOURS", "24"))
+# Past the soft TTL cached text is still served while it refreshes in the background; past the hard TTL it is refetched first
+URL_CACHE_HARD_TTL_HOURS = float(os.getenv("URL_CACHE_HARD_TTL_HOURS", "168"))
+SQLITE_MMAP_BYTES = int(os.getenv("SQLITE_MMAP_MB", "256")) * 1024 * 1024
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SUMMARY_MEMORY_CACHE_MB = float(os.getenv("SUMMARY_MEMORY_CACHE_MB", "16"))
+URL_MEMORY_CACHE_MB = float(os.getenv("URL_MEMORY_CACHE_MB", "64"))
+# Other processes (maintenance and snapshot CLIs, other replicas) change rows without telling this
+# one, so in-memory copies are re-read from SQLite after this long
+MEMORY_CACHE_TTL_SECONDS = float(os.getenv("MEMORY_CACHE_TTL_SECONDS", "60"))
+# Row counts and payload sizes read every payload, so scrapes reuse them for this long
+CACHE_STATS_TTL_SECONDS = float(os.getenv("CACHE_STATS_TTL_SECONDS", "60"))
 
-def _get_db_connection():
-    """Establishes a connection to the SQLite database."""
-    conn = sqlite3.connect(DB_NAME)
+# In-process tier in front of scheme_cache and url_cache, shared by all sessions.
+# Entries hold (column values, payload_format) with payloads still encoded, so
+# the budget covers compressed sizes; saves write through, expiry invalidates.
+_summary_memory = ByteLRUCache(int(SUMMARY_MEMORY_CACHE_MB * 1024 * 1024), MEMORY_CACHE_TTL_SECONDS)
+_url_memory = ByteLRUCache(int(URL_MEMORY_CACHE_MB * 1024 * 1024), MEMORY_CACHE_TTL_SECONDS)
+# canonical requested URL -> url_cache key, for redirects
+_url_alias_memory = ByteLRUCache(1024 * 1024, MEMORY_CACHE_TTL_SECONDS)
+get_metrics("scheme_cache").memory_tier = _summary_memory
+get_metrics("url_cache").memory_tier = _url_memory
+
+# Tier shared by all replicas, behind the local database (see utils/cache_backends.py); None when unset
+_shared_backend = create_backend(CACHE_SHARED_BACKEND)
+
+# Set by init_db: whether this SQLite build has FTS5, so search_index is kept in sync
+_search_enabled = False
+
+# One connection per thread, reused across calls; Streamlit runs each rerun in its own thread
+_local = threading.local()
+
+def _get_db_connection() -> sqlite3.Connection:
+    """
+    Returns this thread's connection to the SQLite database, opening it on first use.
+    Connections run in WAL mode, so readers never wait for a writer and writers
+    only wait for each other (up to the busy timeout).
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.db_name == DB_NAME:
+        return conn
+    if conn is not None:
+        conn.close()
+    conn = sqlite3.connect(DB_NAME, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_BYTES}")
+    conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    _local.conn, _local.db_name = conn, DB_NAME
     return conn
 
+def close_db_connection():
+    """Closes this thread's connection, if it has one."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
 def init_db():
     """Initializes the database and creates the cache tables if they don't exist."""
+    global _search_enabled
     conn = _get_db_connection()
-    cursor = conn.cursor()
+    with conn:
+        cursor = conn.cursor()
+    
+        # Original scheme_cache table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scheme_cache (
+                source_key TEXT PRIMARY KEY,
+                source_type TEXT NOT NULL,
+                summary_en TEXT,
+                summary_te TEXT,
+                pdf_path TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                payload_format INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+    
+        # NEW: URL cache table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS url_cache (
+                url TEXT PRIMARY KEY,
+                content TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                etag TEXT,
+                last_modified TEXT,
+                payload_format INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+    
+        # Validator columns were added after the first release; migrate older databases
+        _add_missing_columns(cursor, "url_cache", {"etag": "TEXT", "last_modified": "TEXT"})
+        # How the payload columns of a row are encoded (see utils/cache_codec.py)
+        _add_missing_columns(cursor, "scheme_cache", {"payload_format": "INTEGER NOT NULL DEFAULT 0"})
+        _add_missing_columns(cursor, "url_cache", {"payload_format": "INTEGER NOT NULL DEFAULT 0"})
+    
+        # Other spellings of a cached URL, and URLs that redirect to it
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS url_alias (
+                alias TEXT PRIMARY KEY,
+                canonical TEXT NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
     
-    # Original scheme_cache table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS scheme_cache (
-            source_key TEXT PRIMARY KEY,
-            source_type TEXT NOT NULL,
-            summary_en TEXT,
-            summary_te TEXT,
-            pdf_path TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+        # Text extracted from uploaded PDFs, one row per page, keyed by the file's content hash
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pdf_page_cache (
+                content_hash TEXT NOT NULL,
+                page_no INTEGER NOT NULL,
+                page_count INTEGER NOT NULL,
+                text TEXT,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (content_hash, page_no)
+            )
+        ''')
+    
+        # Snapshot bundles imported into this database (see utils/cache_snapshot.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS snapshot_log (
+                snapshot_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                base_id TEXT,
+                applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    
+        # Expiry deletes by age; without these it scans every table in full
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scheme_cache_timestamp ON scheme_cache (timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_url_cache_timestamp ON url_cache (timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_url_alias_canonical ON url_alias (canonical)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_pdf_page_cache_timestamp ON pdf_page_cache (timestamp)")
     
-    # NEW: URL cache table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS url_cache (
-            url TEXT PRIMARY KEY,
-            content TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+        if cursor.execute("PRAGMA user_version").fetchone()[0] < 1:
+            _canonicalize_url_keys(cursor)
+            cursor.execute("PRAGMA user_version = 1")
+        # Stays pending while CACHE_COMPRESSION is off, so turning it on later compresses existing rows
+        if cursor.execute("PRAGMA user_version").fetchone()[0] < 2 and _encode_payloads(cursor):
+            cursor.execute("PRAGMA user_version = 2")
     
-    conn.commit()
-    conn.close()
+        # Full-text index over summaries and page text; (re)built from existing rows when first created or its tokenizer changed
+        try:
+            search_index.drop_outdated(cursor)
+        except sqlite3.OperationalError:
+            pass  # No FTS5: create_schema below disables search
+        index_exists = cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'search_docs'").fetchone()
+        _search_enabled = search_index.create_schema(cursor)
+        if _search_enabled and not index_exists:
+            _build_search_index(cursor)
+    
+    # Let incremental_vacuum() return freed pages to the OS. Switching an existing
+    # database needs one full VACUUM, which cannot run inside a transaction.
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    
+    _clear_memory_tiers()
     logger.info("Database initialized with scheme_cache and url_cache tables.")
 
+def _add_missing_columns(cursor, table: str, columns: dict):
+    """Adds any of the given columns that an existing table does not have yet."""
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    for name, col_type in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+
+def _canonicalize_url_keys(cursor):
+    """One-time migration: re-keys url_cache rows saved under raw URLs by their canonical form."""
+    # Newest first: the first row seen for a canonical URL is kept, older spellings of it are dropped
+    rows = cursor.execute("SELECT url, timestamp FROM url_cache ORDER BY timestamp DESC").fetchall()
+    kept = set()
+    for url, _ in rows:
+        canonical = canonicalize_url(url)
+        if canonical in kept:
+            if url != canonical:  # An older canonical row was already replaced by the kept one
+                cursor.execute("DELETE FROM url_cache WHERE url = ?", (url,))
+            continue
+        kept.add(canonical)
+        if canonical != url:
+            cursor.execute("UPDATE OR REPLACE url_cache SET url = ? WHERE url = ?", (canonical, url))
+
+# (table, primary key, payload columns)
+_PAYLOAD_COLUMNS = [
+    ("scheme_cache", "source_key", ("summary_en", "summary_te")),
+    ("url_cache", "url", ("content",)),
+]
+
+def _encode_payloads(cursor) -> bool:
+    """One-time migration: re-encodes payloads stored as plain text in the current format; False if that is plain text."""
+    fmt = cache_codec.current_format()
+    if fmt == cache_codec.FORMAT_TEXT:
+        return False
+    for table, key, fields in _PAYLOAD_COLUMNS:
+        rows = cursor.execute(f"SELECT {key}, {', '.join(fields)} FROM {table} WHERE payload_format = ?",
+                              (cache_codec.FORMAT_TEXT,)).fetchall()
+        for row_key, *values in rows:
+            cursor.execute(
+                f"UPDATE {table} SET {', '.join(f'{field} = ?' for field in fields)}, payload_format = ? WHERE {key} = ?",
+                (*(cache_codec.encode(value, fmt) for value in values), fmt, row_key),
+            )
+    return True
+
+def _build_search_index(cursor):
+    """Indexes every cached summary and page."""
+    for source_key, summary_en, summary_te, fmt in cursor.execute(
+            "SELECT source_key, summary_en, summary_te, payload_format FROM scheme_cache").fetchall():
+        search_index.index_document(cursor, "summary", source_key, cache_codec.decode(summary_en, fmt),
+                                    cache_codec.decode(summary_te, fmt))
+    for url, content, fmt in cursor.execute("SELECT url, content, payload_format FROM url_cache").fetchall():
+        search_index.index_document(cursor, "url", url, text=cache_codec.decode(content, fmt))
+
+def _unindex_rows(cursor, kind: str, where: str, params: tuple):
+    """Drops the url_cache or scheme_cache rows matching `where` from the search index."""
+    if not _search_enabled:
+        return
+    if kind == "summary":
+        rows = cursor.execute(f"SELECT source_key, summary_en, summary_te, payload_format FROM scheme_cache WHERE {where}",
+                              params).fetchall()
+        for source_key, summary_en, summary_te, fmt in rows:
+            search_index.unindex_document(cursor, "summary", source_key, cache_codec.decode(summary_en, fmt),
+                                          cache_codec.decode(summary_te, fmt))
+    else:
+        for url, content, fmt in cursor.execute(f"SELECT url, content, payload_format FROM url_cache WHERE {where}",
+                                                params).fetchall():
+            search_index.unindex_document(cursor, "url", url, text=cache_codec.decode(content, fmt))
+
+class CachedRow(Mapping):
+    """A cache row whose payload columns are decoded on first access, so lookups that only need metadata skip it."""
+
+    def __init__(self, values: dict, fmt: int, payload_fields: tuple[str, ...]):
+        self._format = fmt
+        self._values = dict(values)
+        self._encoded = set(payload_fields) if fmt != cache_codec.FORMAT_TEXT else set()
+
+    def __getitem__(self, key):
+        value = self._values[key]
+        if key in self._encoded:
+            value = self._values[key] = cache_codec.decode(value, self._format)
+            self._encoded.discard(key)
+        return value
+
+    def __contains__(self, key):
+        return key in self._values  # Mapping's default would decode the value
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def has_value(self, key) -> bool:
+        """True if the column holds a non-empty value, without decoding it."""
+        return self._values.get(key) not in (None, "", b"")
+
+def _split_row(row: sqlite3.Row) -> tuple[dict, int]:
+    """A row as (column values without payload_format, payload_format), the form kept in memory."""
+    return {key: row[key] for key in row.keys() if key != "payload_format"}, row["payload_format"]
+
+def _clear_memory_tiers():
+    _summary_memory.clear()
+    _url_memory.clear()
+    _url_alias_memory.clear()
+
+# cache -> SQL expression for the payload bytes of a row
+_CACHE_PAYLOAD_BYTES = {
+    "scheme_cache": "COALESCE(LENGTH(CAST(summary_en AS BLOB)), 0) + COALESCE(LENGTH(CAST(summary_te AS BLOB)), 0)",
+    "url_cache": "COALESCE(LENGTH(CAST(content AS BLOB)), 0)",
+    "pdf_page_cache": "COALESCE(LENGTH(CAST(text AS BLOB)), 0)",
+}
+
+# (DB_NAME, time.monotonic() when measured, {cache: (rows, payload bytes)})
+_table_sizes = (None, 0.0, {})
+_table_sizes_lock = threading.Lock()
+
+def _get_table_sizes() -> dict:
+    """Rows and payload bytes per cache table, measured at most once per CACHE_STATS_TTL_SECONDS."""
+    global _table_sizes
+    with _table_sizes_lock:
+        db_name, measured_at, sizes = _table_sizes
+        if db_name != DB_NAME or time.monotonic() - measured_at > CACHE_STATS_TTL_SECONDS:
+            conn = _get_db_connection()
+            sizes = {
+                cache: conn.execute(f"SELECT COUNT(*), COALESCE(SUM({payload_bytes}), 0) FROM {cache}").fetchone()
+                for cache, payload_bytes in _CACHE_PAYLOAD_BYTES.items()
+            }
+            _table_sizes = (DB_NAME, time.monotonic(), sizes)
+        return sizes
+
+def get_cache_stats() -> dict:
+    """
+    Per cache: lookup hits, misses and latency histogram, rows expired, rows and
+    payload bytes in SQLite (up to CACHE_STATS_TTL_SECONDS old), and the
+    in-process tier's counters (memory) if it has one.
+    """
+    stats = {}
+    for cache, (entries, size) in _get_table_sizes().items():
+        metrics = get_metrics(cache)
+        stats[cache] = {
+            **metrics.snapshot(),
+            "entries": entries,
+            "bytes": size,
+            "memory": metrics.memory_tier.stats() if metrics.memory_tier is not None else None,
+        }
+    return stats
+
+def _url_key(cursor, url: str) -> str:
+    """The url_cache key for a URL: its canonical form, following any recorded redirect."""
+    canonical = canonicalize_url(url)
+    row = cursor.execute("SELECT canonical FROM url_alias WHERE alias = ?", (canonical,)).fetchone()
+    return row[0] if row else canonical
+
 def compute_source_key(source_type: str, content: str) -> str:
     """Computes a SHA256 hash for the given content to be used as a cache key."""
     return hashlib.sha256(f"{source_type}:{content}".encode()).hexdigest()
 
-def get_cached_summary(source_key: str) -> dict | None:
+@instrumented("scheme_cache")
+def get_cached_summary(source_key: str) -> CachedRow | None:
     """Retrieves a cached summary by its source key."""
-    conn = _get_db_connection()
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM scheme_cache WHERE source_key = ?", (source_key,))
-    result = cursor.fetchone()
-    conn.close()
-    return dict(result) if result else None
+    entry = _summary_memory.get(source_key)
+    if entry is None:
+        cursor = _get_db_connection().cursor()
+        cursor.row_factory = sqlite3.Row
+        cursor.execute("SELECT * FROM scheme_cache WHERE source_key = ?", (source_key,))
+        result = cursor.fetchone()
+        if result:
+            entry = _split_row(result)
+            _summary_memory.put(source_key, entry)
+        else:
+            entry = _get_shared_summary(source_key)
+            if entry is None:
+                return None
+    return CachedRow(*entry, ("summary_en", "summary_te"))
+
+def _shared_record(namespace: str, key: str) -> tuple[dict, int] | None:
+    """A record from the shared tier as (column values, payload_format); None on a miss or an unknown format."""
+    if _shared_backend is None:
+        return None
+    record = _shared_backend.get(namespace, key)
+    if not record:
+        return None
+    if str(record.get("timestamp") or "") < str(_expiry_cutoff(CACHE_MAX_AGE_DAYS)):
+        # Expired here already; copying it back would only have maintenance delete it again
+        return None
+    fmt = record.pop("payload_format", None)
+    if fmt not in (cache_codec.FORMAT_TEXT, cache_codec.FORMAT_ZLIB_V1):
+        # Written by a newer replica; this one cannot decode it
+        return None
+    return record, fmt
+
+def _get_shared_summary(source_key: str) -> tuple[dict, int] | None:
+    """Looks a summary up in the shared tier and keeps a local copy."""
+    shared = _shared_record("summary", source_key)
+    if shared is None:
+        return None
+    values, fmt = shared
+    try:
+        _insert_summary(values, fmt, cache_codec.decode(values["summary_en"], fmt), cache_codec.decode(values["summary_te"], fmt))
+    except sqlite3.IntegrityError:
+        pass  # Another session of this replica copied it first
+    logger.info(f"Found summary in the shared cache: {source_key[:16]}...")
+    return values, fmt
 
 def save_to_cache(source_key: str, source_type: str, summary_en: str, summary_te: str, pdf_path: str):
     """Saves a new summary to the cache."""
-    conn = _get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO scheme_cache (source_key, source_type, summary_en, summary_te, pdf_path)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (source_key, source_type, summary_en, summary_te, pdf_path))
-    conn.commit()
-    conn.close()
+    fmt = cache_codec.current_format()
+    values = {
+        "source_key": source_key, "source_type": source_type,
+        "summary_en": cache_codec.encode(summary_en, fmt), "summary_te": cache_codec.encode(summary_te, fmt),
+        "pdf_path": pdf_path,
+        # Same form as the column default CURRENT_TIMESTAMP, so the memory copy matches the row
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    _insert_summary(values, fmt, summary_en, summary_te)
+    if _shared_backend is not None:
+        # PDF paths are local to each replica, so other replicas render their own
+        _shared_backend.put("summary", source_key, {**values, "pdf_path": None, "payload_format": fmt})
     logger.info(f"Saved new summary to cache with key: {source_key[:16]}...")
 
+def _insert_summary(values: dict, fmt: int, summary_en: str, summary_te: str):
+    """Inserts a scheme_cache row (payloads already encoded), indexes it for search and writes it through to memory."""
+    conn = _get_db_connection()
+    with conn:
+        conn.execute('''
+            INSERT INTO scheme_cache (source_key, source_type, summary_en, summary_te, pdf_path, timestamp, payload_format)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (values["source_key"], values["source_type"], values["summary_en"], values["summary_te"],
+              values["pdf_path"], values["timestamp"], fmt))
+        if _search_enabled:
+            search_index.index_document(conn.cursor(), "summary", values["source_key"], summary_en, summary_te)
+    _summary_memory.put(values["source_key"], (values, fmt))
+
+def update_cached_pdf_path(source_key: str, pdf_path: str):
+    """Points a cached summary at a newly rendered PDF."""
+    conn = _get_db_connection()
+    with conn:
+        conn.execute("UPDATE scheme_cache SET pdf_path = ? WHERE source_key = ?", (pdf_path, source_key))
+    _summary_memory.pop(source_key)
+
+def get_referenced_pdf_paths() -> set[str]:
+    """Returns every PDF path a cached summary points to."""
+    rows = _get_db_connection().execute("SELECT pdf_path FROM scheme_cache WHERE pdf_path IS NOT NULL AND pdf_path != ''").fetchall()
+    return {row[0] for row in rows}
+
 # --- NEW FUNCTIONS FOR URL CACHING ---
 
-def save_url_cache(url: str, content: str):
-    """Save extracted content from a URL to cache."""
+def save_url_cache(url: str, content: str, etag: str | None = None, last_modified: str | None = None,
+                   final_url: str | None = None):
+    """
+    Save extracted content from a URL to cache, along with its HTTP validators.
+    Entries are keyed by canonical URL; if the fetch was redirected, pass the
+    `final_url` so both the requested URL and the redirect target share one entry.
+    """
     try:
-        conn = _get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO url_cache (url, content, timestamp)
-            VALUES (?, ?, ?)
-        ''', (url, content, datetime.datetime.now()))
-        conn.commit()
-        conn.close()
+        key = canonicalize_url(final_url or url)
+        requested = canonicalize_url(url)
+        fmt = cache_codec.current_format()
+        values = {"url": key, "content": cache_codec.encode(content, fmt), "timestamp": str(datetime.datetime.now()),
+                  "etag": etag, "last_modified": last_modified}
+        _store_url(requested, values, fmt, content)
+        _put_shared_url(requested, values, fmt)
         logger.info(f"Saved URL content to cache: {url}")
     except Exception as e:
         logger.error(f"Error saving URL cache: {e}")
 
+def _store_url(requested: str, values: dict, fmt: int, content: str):
+    """Writes a url_cache row (payload already encoded) and its alias, reindexes it and writes both through to memory."""
+    key = values["url"]
+    conn = _get_db_connection()
+    with conn:
+        # Take the write lock before reading the old row to unindex, so no other save can commit in between
+        conn.execute("BEGIN IMMEDIATE")
+        if requested != key:
+            conn.execute('''
+                INSERT OR REPLACE INTO url_alias (alias, canonical, timestamp) VALUES (?, ?, ?)
+            ''', (requested, key, values["timestamp"]))
+        _unindex_rows(conn.cursor(), "url", "url = ?", (key,))
+        conn.execute('''
+            INSERT OR REPLACE INTO url_cache (url, content, timestamp, etag, last_modified, payload_format)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (key, values["content"], values["timestamp"], values["etag"], values["last_modified"], fmt))
+        if _search_enabled:
+            search_index.index_document(conn.cursor(), "url", key, text=content)
+    if requested != key:
+        _url_alias_memory.put(requested, key)
+    _url_memory.put(key, (values, fmt))
+
+def _put_shared_url(requested: str, values: dict, fmt: int):
+    """Writes a url_cache row to the shared tier, under the redirect target and the requested URL."""
+    if _shared_backend is None:
+        return
+    record = {**values, "payload_format": fmt}
+    for key in {values["url"], requested}:
+        _shared_backend.put("url", key, record)
+
 def get_url_cache(url: str) -> str | None:
     """Get cached content for a URL."""
+    entry = get_url_cache_entry(url)
+    return entry["content"] if entry else None
+
+@instrumented("url_cache")
+def get_url_cache_entry(url: str) -> CachedRow | None:
+    """Get the cached row for a URL: content, timestamp, etag and last_modified."""
+    try:
+        canonical = canonicalize_url(url)
+        entry = _url_memory.get(_url_alias_memory.get(canonical) or canonical)
+        if entry is None:
+            cursor = _get_db_connection().cursor()
+            key = _url_key(cursor, url)
+            cursor.row_factory = sqlite3.Row
+            cursor.execute("SELECT url, content, timestamp, etag, last_modified, payload_format FROM url_cache WHERE url = ?", (key,))
+            result = cursor.fetchone()
+            if result:
+                if key != canonical:
+                    _url_alias_memory.put(canonical, key)
+                entry = _split_row(result)
+                _url_memory.put(key, entry)
+            else:
+                entry = _shared_record("url", canonical)
+                if entry is None:
+                    return None
+                _store_url(canonical, entry[0], entry[1], cache_codec.decode(entry[0]["content"], entry[1]))
+                logger.info(f"Copied URL content from the shared cache: {url}")
+        logger.info(f"Found cached content for URL: {url}")
+        return CachedRow(*entry, ("content",))
+    except Exception as e:
+        logger.error(f"Error retrieving URL cache: {e}")
+        return None
+
+def touch_url_cache(url: str, etag: str | None = None, last_modified: str | None = None):
+    """Marks a cached URL as fresh again after the server confirmed it is unchanged (HTTP 304)."""
     try:
         conn = _get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT content FROM url_cache WHERE url = ?", (url,))
-        result = cursor.fetchone()
-        conn.close()
-        if result:
-            logger.info(f"Found cached content for URL: {url}")
-            return result[0]
+        with conn:
+            cursor = conn.cursor()
+            key = _url_key(cursor, url)
+            cursor.execute('''
+                UPDATE url_cache SET timestamp = ?, etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE url = ?
+            ''', (datetime.datetime.now(), etag, last_modified, key))
+            if _shared_backend is not None:
+                cursor.row_factory = sqlite3.Row
+                row = cursor.execute("SELECT url, content, timestamp, etag, last_modified, payload_format FROM url_cache WHERE url = ?", (key,)).fetchone()
+        _url_memory.pop(key)
+        if _shared_backend is not None and row:
+            # Other replicas skip their own revalidation until this one goes stale again
+            _put_shared_url(canonicalize_url(url), *_split_row(row))
+        logger.info(f"Revalidated cached URL content: {url}")
+    except Exception as e:
+        logger.error(f"Error refreshing URL cache: {e}")
+
+@lru_cache(maxsize=4)
+def _domain_ttls(setting: str) -> dict:
+    """
+    Parses URL_CACHE_DOMAIN_TTLS, e.g. "pmkisan.gov.in=6|72,example.gov.in=1|24".
+    Each domain (and its subdomains) maps to (soft, hard) TTLs in hours.
+    Malformed items are logged and skipped.
+    """
+    ttls = {}
+    for item in setting.split(","):
+        if not item.strip():
+            continue
+        domain, _, hours = item.strip().partition("=")
+        soft, _, hard = hours.partition("|")
+        try:
+            soft = float(soft)
+            hard = float(hard) if hard else max(soft, URL_CACHE_HARD_TTL_HOURS)
+        except ValueError:
+            soft = None
+        if not domain or soft is None:
+            logger.warning(f"Ignoring malformed URL_CACHE_DOMAIN_TTLS item: {item.strip()!r}")
+            continue
+        ttls[domain.lower()] = (soft, hard)
+    return ttls
+
+def url_cache_ttls(url: str) -> tuple[float, float]:
+    """The (soft, hard) TTLs in hours for a URL; the most specific matching domain wins."""
+    host = (urlsplit(url).hostname or "").lower()
+    best = None
+    for domain, ttls in _domain_ttls(os.getenv("URL_CACHE_DOMAIN_TTLS", "")).items():
+        if (host == domain or host.endswith("." + domain)) and (best is None or len(domain) > len(best[0])):
+            best = (domain, ttls)
+    return best[1] if best else (URL_CACHE_TTL_HOURS, URL_CACHE_HARD_TTL_HOURS)
+
+def _url_cache_age(entry: dict) -> datetime.timedelta | None:
+    try:
+        return datetime.datetime.now() - datetime.datetime.fromisoformat(str(entry["timestamp"]))
+    except (KeyError, TypeError, ValueError):
         return None
+
+def is_url_cache_fresh(entry: dict, ttl_hours: float | None = None) -> bool:
+    """Returns True if a url_cache entry is younger than `ttl_hours`, by default its domain's soft TTL."""
+    age = _url_cache_age(entry)
+    if ttl_hours is None:
+        ttl_hours = url_cache_ttls(entry.get("url", ""))[0]
+    return age is not None and age < datetime.timedelta(hours=ttl_hours)
+
+def url_cache_state(entry: dict) -> str:
+    """Classifies an entry: "fresh" within its soft TTL, "stale" until its hard TTL, "expired" after that."""
+    age = _url_cache_age(entry)
+    soft, hard = url_cache_ttls(entry.get("url", ""))
+    if age is None or age >= datetime.timedelta(hours=hard):
+        return "expired"
+    return "fresh" if age < datetime.timedelta(hours=soft) else "stale"
+
+# --- SEARCH ---
+
+def search_cache(query: str, limit: int = 10) -> list[dict]:
+    """
+    Ranked full-text search over cached summaries (English and Telugu) and extracted page text.
+    Each result has kind ("summary" or "url"), key, score (lower is better), title, snippet,
+    timestamp, and summary_key: the scheme_cache key of the summary to open, or None.
+    """
+    if not _search_enabled:
+        return []
+    cursor = _get_db_connection().cursor()
+    try:
+        matches = search_index.search(cursor, query, limit)
+    except sqlite3.OperationalError as e:
+        logger.error(f"Search failed for {query!r}: {e}")
+        return []
+
+    results, seen_summaries = [], set()
+    for kind, key, score in matches:
+        if kind == "summary":
+            row = cursor.execute("SELECT summary_en, summary_te, timestamp, payload_format FROM scheme_cache WHERE source_key = ?",
+                                 (key,)).fetchone()
+            if not row:
+                continue
+            summary_en, summary_te = cache_codec.decode(row[0], row[3]), cache_codec.decode(row[1], row[3])
+            title = next((line.strip(" *#") for line in (summary_en or "").splitlines() if line.strip(" *#")), "Summary")
+            # Show the Telugu summary when the query matched only Telugu text
+            matched_en = any(term.lower() in (summary_en or "").lower() for term in query.split())
+            snippet_source = summary_en if matched_en else summary_te
+            summary_key, timestamp = key, row[2]
+        else:
+            row = cursor.execute("SELECT content, timestamp, payload_format FROM url_cache WHERE url = ?", (key,)).fetchone()
+            if not row:
+                continue
+            snippet_source = cache_codec.decode(row[0], row[2]) or ""
+            title, timestamp = key, row[1]
+            # The app keys a URL's summary by the first 10,000 characters of its extracted text
+            summary_key = compute_source_key("url", snippet_source[:10000])
+            if not cursor.execute("SELECT 1 FROM scheme_cache WHERE source_key = ?", (summary_key,)).fetchone():
+                summary_key = None
+        if summary_key and summary_key in seen_summaries:
+            continue
+        seen_summaries.add(summary_key)
+        results.append({"kind": kind, "key": key, "score": score, "title": title, "timestamp": timestamp,
+                        "snippet": search_index.make_snippet(snippet_source, query), "summary_key": summary_key})
+    return results
+
+# --- PDF TEXT CACHE ---
+
+@instrumented("pdf_page_cache")
+def get_pdf_pages(content_hash: str, first: int = 0, stop: int | None = None) -> tuple[int, dict[int, str]] | None:
+    """
+    Returns (page_count, {page_no: text}) for the pages of a PDF already extracted,
+    optionally only pages first <= page_no < stop, or None if none of them are cached.
+    The dict may be partial.
+    """
+    try:
+        rows = _get_db_connection().execute(
+            "SELECT page_no, page_count, text FROM pdf_page_cache WHERE content_hash = ? AND page_no >= ? AND page_no < ?",
+            (content_hash, first, stop if stop is not None else 2**62),
+        ).fetchall()
+        if not rows:
+            return None
+        return rows[0][1], {page_no: text for page_no, _, text in rows}
     except Exception as e:
-        logger.error(f"Error retrieving URL cache: {e}")
+        logger.error(f"Error retrieving PDF page cache: {e}")
         return None
 
+def save_pdf_pages(content_hash: str, page_count: int, pages: dict[int, str]):
+    """Saves extracted page texts of a PDF; pages already cached are overwritten."""
+    try:
+        conn = _get_db_connection()
+        now = datetime.datetime.now()
+        with conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO pdf_page_cache (content_hash, page_no, page_count, text, timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(content_hash, page_no, page_count, text, now) for page_no, text in pages.items()])
+    except Exception as e:
+        logger.error(f"Error saving PDF page cache: {e}")
+
+def _expiry_cutoff(days_old: float) -> datetime.datetime:
+    """Rows with an older timestamp are expired (timestamps compare as text, as in SQL)."""
+    return datetime.datetime.now() - datetime.timedelta(days=days_old)
+
+def expire_shared_cache(days_old: float) -> int:
+    """Deletes shared-tier records written more than `days_old` days ago; returns how many (0 without a shared tier)."""
+    if _shared_backend is None:
+        return 0
+    return _shared_backend.expire(days_old * 86400)
+
 def clear_old_cache(days_old: int = 30):
     """Deletes cache entries older than the specified number of days."""
     conn = _get_db_connection()
-    cursor = conn.cursor()
-    cutoff_date = datetime.datetime.now() - datetime.timedelta(days=days_old)
+    cutoff_date = _expiry_cutoff(days_old)
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        # Clear old scheme cache
+        _unindex_rows(conn.cursor(), "summary", "timestamp < ?", (cutoff_date,))
+        expired = conn.execute("DELETE FROM scheme_cache WHERE timestamp < ?", (cutoff_date,)).rowcount
+        get_metrics("scheme_cache").add_expired(expired)
+        
+        # Clear old URL cache
+        _unindex_rows(conn.cursor(), "url", "timestamp < ?", (cutoff_date,))
+        expired = conn.execute("DELETE FROM url_cache WHERE timestamp < ?", (cutoff_date,)).rowcount
+        get_metrics("url_cache").add_expired(expired)
+        conn.execute("DELETE FROM url_alias WHERE canonical NOT IN (SELECT url FROM url_cache)")
+        
+        # Clear old PDF page text
+        expired = conn.execute("DELETE FROM pdf_page_cache WHERE timestamp < ?", (cutoff_date,)).rowcount
+        get_metrics("pdf_page_cache").add_expired(expired)
     
-    # Clear old scheme cache
-    cursor.execute("DELETE FROM scheme_cache WHERE timestamp < ?", (cutoff_date,))
+    # Drop the same rows from the memory tiers (timestamps compare as text, as in SQL)
+    expired = lambda key, entry: str(entry[0]["timestamp"]) < str(cutoff_date)
+    _summary_memory.remove_where(expired)
+    _url_memory.remove_where(expired)
+    _url_alias_memory.clear()
     
-    # Clear old URL cache
-    cursor.execute("DELETE FROM url_cache WHERE timestamp < ?", (cutoff_date,))
-    
-    conn.commit()
-    conn.close()
-    logger.info(f"Cleared cache entries older than {days_old} days.")
\ No newline at end of file
+    logger.info(f"Cleared cache entries older than {days_old} days.")
+
+def incremental_vacuum(max_pages: int | None = None) -> int:
+    """Returns up to `max_pages` free pages (all if None) to the OS; returns how many were free before."""
+    conn = _get_db_connection()
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if free:
+        # execute() would step the pragma once, freeing a single page; executescript() runs it to completion
+        conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages) if max_pages else 0});")
+    return free
+
+# --- Snapshots (bundles are built and unpacked by utils/cache_snapshot.py) ---
+
+def backup_cache_db(dest_path: str):
+    """
+    Copies the cache database to `dest_path` with SQLite's online backup API:
+    a consistent copy, search index included, while sessions keep writing.
+    """
+    dest = sqlite3.connect(dest_path)
+    try:
+        _get_db_connection().backup(dest)
+        dest.execute("PRAGMA journal_mode = DELETE")  # One self-contained file, no -wal beside it
+    finally:
+        dest.close()
+
+def restore_cache_db(source_path: str):
+    """
+    Replaces the whole cache database with another one (an unpacked snapshot) through
+    the online backup API, so connections held by other threads and processes stay valid.
+    """
+    source = sqlite3.connect(source_path)
+    try:
+        source.backup(_get_db_connection())
+    finally:
+        source.close()
+    _clear_memory_tiers()
+
+def _local_pdf_path(pdf_path: str | None, pdf_dir: str) -> str | None:
+    """Where a snapshot's PDF lives on this replica, or None if it was not shipped."""
+    if not pdf_path:
+        return None
+    path = os.path.join(pdf_dir, os.path.basename(pdf_path))
+    return path if os.path.exists(path) else None
+
+def rebase_pdf_paths(pdf_dir: str) -> int:
+    """Points cached summaries at their PDFs in `pdf_dir`, clearing paths to PDFs that are not there; returns rows changed."""
+    conn = _get_db_connection()
+    rows = conn.execute("SELECT source_key, pdf_path FROM scheme_cache WHERE pdf_path IS NOT NULL").fetchall()
+    changes = [(_local_pdf_path(old, pdf_dir), key) for key, old in rows]
+    changes = [change for change, (_, old) in zip(changes, rows) if change[0] != old]
+    with conn:
+        conn.executemany("UPDATE scheme_cache SET pdf_path = ? WHERE source_key = ?", changes)
+    _summary_memory.clear()
+    return len(changes)
+
+def merge_cache_db(source_path: str, pdf_dir: str) -> dict:
+    """
+    Copies rows from another cache database (an unpacked snapshot) into this one:
+    summaries and PDF pages this replica lacks, and URL entries newer than its own.
+    Summaries are pointed at their PDFs in `pdf_dir`. Returns rows copied per cache.
+    """
+    counts = {"scheme_cache": 0, "url_cache": 0, "url_alias": 0, "pdf_page_cache": 0}
+    known_formats = (cache_codec.FORMAT_TEXT, cache_codec.FORMAT_ZLIB_V1)
+    conn = _get_db_connection()
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    source.row_factory = sqlite3.Row
+    try:
+        for row in source.execute("SELECT * FROM scheme_cache"):
+            values, fmt = _split_row(row)
+            if fmt not in known_formats or conn.execute(
+                    "SELECT 1 FROM scheme_cache WHERE source_key = ?", (values["source_key"],)).fetchone():
+                continue
+            values["pdf_path"] = _local_pdf_path(values["pdf_path"], pdf_dir)
+            _insert_summary(values, fmt, cache_codec.decode(values["summary_en"], fmt),
+                            cache_codec.decode(values["summary_te"], fmt))
+            counts["scheme_cache"] += 1
+
+        for row in source.execute("SELECT url, content, timestamp, etag, last_modified, payload_format FROM url_cache"):
+            values, fmt = _split_row(row)
+            local = conn.execute("SELECT timestamp FROM url_cache WHERE url = ?", (values["url"],)).fetchone()
+            if fmt not in known_formats or (local and str(local[0]) >= str(values["timestamp"])):
+                continue
+            _store_url(values["url"], values, fmt, cache_codec.decode(values["content"], fmt))
+            counts["url_cache"] += 1
+    finally:
+        source.close()
+
+    conn.execute("ATTACH DATABASE ? AS snapshot", (source_path,))
+    try:
+        with conn:
+            counts["url_alias"] = conn.execute('''
+                INSERT OR IGNORE INTO url_alias (alias, canonical, timestamp)
+                SELECT alias, canonical, timestamp FROM snapshot.url_alias
+            ''').rowcount
+            counts["pdf_page_cache"] = conn.execute('''
+                INSERT OR IGNORE INTO pdf_page_cache (content_hash, page_no, page_count, text, timestamp)
+                SELECT content_hash, page_no, page_count, text, timestamp FROM snapshot.pdf_page_cache
+            ''').rowcount
+    finally:
+        conn.execute("DETACH DATABASE snapshot")
+    _url_alias_memory.clear()
+    return counts
+
+def is_cache_empty() -> bool:
+    """True if no cache table holds a row."""
+    conn = _get_db_connection()
+    return not any(conn.execute(f"SELECT 1 FROM {cache} LIMIT 1").fetchone() for cache in _CACHE_PAYLOAD_BYTES)
+
+def applied_snapshots() -> set[str]:
+    """Ids of the snapshot bundles already imported into this database."""
+    return {row[0] for row in _get_db_connection().execute("SELECT snapshot_id FROM snapshot_log")}
+
+def record_snapshot(snapshot_id: str, kind: str, base_id: str | None = None):
+    conn = _get_db_connection()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO snapshot_log (snapshot_id, kind, base_id) VALUES (?, ?, ?)",
+                     (snapshot_id, kind, base_id))
@@ -0,0 +1,33 @@
+# utils/deadline.py
+
+import os
+import time
+
+# Upper bound for one "Fetching content..." request, across every extraction strategy
+EXTRACTION_DEADLINE_SECONDS = float(os.getenv("EXTRACTION_DEADLINE_SECONDS", "60"))
+
+class DeadlineExceeded(Exception):
+    """Raised when a step is asked to start after its request's deadline has passed."""
+
+class Deadline:
+    """A fixed point in time that every step of one request shares."""
+
+    def __init__(self, seconds: float = EXTRACTION_DEADLINE_SECONDS):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: float) -> float:
+        """The step's own timeout `cap`, shortened to the remaining budget. Raises if none is left."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("Request deadline exceeded")
+        return min(cap, remaining)
+
+    def sleep(self, seconds: float):
+        """Sleeps for `seconds`, or only until the deadline if that comes first."""
+        time.sleep(min(seconds, self.remaining()))
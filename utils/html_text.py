@@ -0,0 +1,100 @@
+# utils/html_text.py
+
+import os
+import re
+from lxml import etree
+from readability import Document
+from readability.encoding import get_encoding
+from readability.htmls import build_doc
+import lxml.html
+
+# Pages larger than this are truncated before parsing; lxml recovers from the cut-off markup
+MAX_HTML_BYTES = int(os.getenv("MAX_HTML_BYTES", str(5 * 1024 * 1024)))
+
+# Subtrees that never hold scheme content but dominate parse and scoring time on portals
+PRUNE_TAGS = ("script", "style", "noscript", "template", "svg", "iframe", "nav", "footer", "header", "aside")
+
+_CONTENT_RE = re.compile(r'content|main', re.I)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+def parse_html(content: bytes | str):
+    """
+    Parses a page once with lxml, capped at MAX_HTML_BYTES, and strips the
+    PRUNE_TAGS subtrees.
+    """
+    if isinstance(content, str):
+        if len(content) > MAX_HTML_BYTES // 4:  # Only then can it exceed the cap once encoded
+            content = content.encode("utf-8")[:MAX_HTML_BYTES].decode("utf-8", "ignore")
+    elif len(content) > MAX_HTML_BYTES:
+        content = trim_partial_utf8(content[:MAX_HTML_BYTES])
+    doc, _ = build_doc(_decode(content))
+    etree.strip_elements(doc, *PRUNE_TAGS, with_tail=False)
+    return doc
+
+def trim_partial_utf8(data: bytes) -> bytes:
+    """
+    Drops a UTF-8 sequence cut off at the end of truncated bytes, so they still
+    decode strictly (a Telugu character is three bytes). Other bytes are kept.
+    """
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0xC0 != 0x80:  # Not a continuation byte: the last character starts here
+            length = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return data[:-back] if byte >= 0xC0 and length > back else data
+    return data
+
+def _decode(content: bytes | str) -> str:
+    """
+    Decodes page bytes using the declared charset, then UTF-8, and only then
+    readability's chardet-based guess, which is slow on large pages.
+    """
+    if isinstance(content, str):
+        return content
+    match = _META_CHARSET_RE.search(content[:4096])
+    for encoding in ((match.group(1).decode("ascii", "ignore"),) if match else ()) + ("utf-8",):
+        try:
+            return content.decode(encoding)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return content.decode(get_encoding(content) or "utf-8", "replace")
+
+def text_lines(element, min_line_length: int = 0) -> list[str]:
+    """Returns the stripped, non-empty text nodes under an element, in document order."""
+    lines = []
+    for text in element.itertext():
+        text = text.strip()
+        if text and len(text) > min_line_length:
+            lines.append(text)
+    return lines
+
+def readable_text(doc) -> str:
+    """
+    Runs readability on an already-parsed tree and returns its text.
+    Falls back to main_text() when readability finds too little.
+    """
+    summary_html = Document(doc).summary()
+    extracted_text = "\n".join(text_lines(lxml.html.fromstring(summary_html)))
+    if len(extracted_text) > 200:
+        return extracted_text
+    return main_text(doc)
+
+def main_text(doc) -> str:
+    """Text of the main content block (main, article, content/main div), or of the whole body."""
+    main_content = None
+    for candidate in (doc.find(".//main"), doc.find(".//article")):
+        if candidate is not None:
+            main_content = candidate
+            break
+    if main_content is None:
+        for attr in ("class", "id"):
+            for div in doc.iter("div"):
+                if _CONTENT_RE.search(div.get(attr) or ""):
+                    main_content = div
+                    break
+            if main_content is not None:
+                break
+    if main_content is None:
+        main_content = doc.find(".//body")
+    if main_content is None:
+        return ""
+    return "\n".join(text_lines(main_content, min_line_length=3))
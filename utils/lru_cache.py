@@ -0,0 +1,96 @@
+# utils/lru_cache.py
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+def sizeof(value) -> int:
+    """Approximate memory held by a cached value: strings, bytes, and lists/tuples/dicts of them."""
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+class ByteLRUCache:
+    """
+    A thread-safe least-recently-used cache bounded by the memory its values hold
+    rather than by entry count. Values larger than the whole budget are not stored.
+    With `ttl_seconds`, entries older than that are dropped on lookup (counted as
+    misses), bounding how long a copy can outlive a change made elsewhere.
+    Counts hits, misses and evictions (entries dropped to stay within budget).
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float | None = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Returns the cached value, or None, marking it as most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] < time.monotonic():
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        size = sizeof(value)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def remove_where(self, predicate) -> int:
+        """Drops every entry for which predicate(key, value) is true; returns how many were dropped."""
+        with self._lock:
+            doomed = [key for key, (value, _, _) in self._entries.items() if predicate(key, value)]
+            for key in doomed:
+                self._discard(key)
+            return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> dict:
+        """Counters and current size: hits, misses, evictions, entries, bytes, max_bytes."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
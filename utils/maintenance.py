@@ -0,0 +1,66 @@
+# utils/maintenance.py
+"""
+Periodic cache maintenance: expires old cache rows and shared-tier records
+(see utils/cache_backends.py), garbage-collects summary PDFs in the shared
+directory and returns freed database pages to the OS.
+
+The app starts this once per server process on a daemon thread (see
+start_background_maintenance) instead of running it on every rerun.
+
+Usage:
+    python -m utils.maintenance [--days-old 7] [--shared-dir shared]
+"""
+
+import argparse
+import os
+import threading
+import time
+from utils.db_cache import CACHE_MAX_AGE_DAYS, init_db, clear_old_cache, expire_shared_cache, incremental_vacuum
+from utils.pdf_store import gc_shared_pdfs
+from utils.logger import logger
+
+MAINTENANCE_INTERVAL_MINUTES = float(os.getenv("MAINTENANCE_INTERVAL_MINUTES", "60"))
+# Pages returned per pass; the rest are kept for reuse by later writes
+VACUUM_MAX_PAGES = int(os.getenv("VACUUM_MAX_PAGES", "2000"))
+
+def run_maintenance(shared_dir: str, days_old: float = CACHE_MAX_AGE_DAYS,
+                    vacuum_pages: int | None = VACUUM_MAX_PAGES) -> dict:
+    """Runs one maintenance pass; returns how long it took and what the PDF GC did."""
+    started = time.perf_counter()
+    clear_old_cache(days_old=days_old)
+    shared_expired = expire_shared_cache(days_old)
+    pdf_report = gc_shared_pdfs(shared_dir)
+    free_pages = incremental_vacuum(vacuum_pages)
+    elapsed = time.perf_counter() - started
+    logger.info(f"Cache maintenance finished in {elapsed:.2f}s ({free_pages} free database pages, "
+                f"{shared_expired} shared records expired).")
+    return {"seconds": elapsed, "free_pages": free_pages, "shared_expired": shared_expired, "pdfs": pdf_report}
+
+def start_background_maintenance(shared_dir: str, interval_minutes: float = MAINTENANCE_INTERVAL_MINUTES,
+                                 days_old: float = CACHE_MAX_AGE_DAYS) -> threading.Thread:
+    """Runs `run_maintenance` now and then every `interval_minutes` on a daemon thread."""
+    def _run():
+        while True:
+            try:
+                run_maintenance(shared_dir, days_old)
+            except Exception as e:
+                logger.error(f"Cache maintenance failed: {e}")
+            time.sleep(interval_minutes * 60)
+
+    thread = threading.Thread(target=_run, name="cache-maintenance", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    parser = argparse.ArgumentParser(description="Expire old cache entries and summary PDFs, then vacuum the database.")
+    parser.add_argument("--days-old", type=float, default=CACHE_MAX_AGE_DAYS, help="Age after which cache rows expire")
+    parser.add_argument("--shared-dir", default=os.getenv("SHARED_DIR", "shared"))
+    args = parser.parse_args()
+
+    init_db()
+    report = run_maintenance(args.shared_dir, args.days_old, vacuum_pages=None)
+    print(f"Maintenance took {report['seconds']:.2f}s; {report['free_pages']} free pages vacuumed; "
+          f"{report['pdfs']['unreferenced'] + report['pdfs']['evicted']} PDFs removed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# utils/pdf_renderer.py
+"""
+Long-lived renderer for the summary PDF.
+
+Registering a TrueType font with fpdf2 parses the whole font file, and every
+PDF later subsets it again for embedding. For DejaVuSans (about 750 KB, ~6000
+glyphs) that dominated the cost of a summary PDF. The renderer therefore cuts
+each font down once per process to the Unicode ranges summaries use, caches
+the reduced font file on disk, and registers that small file per document.
+Documents containing characters outside the reduced font fall back to the
+full font, so output never loses glyphs.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from fontTools import subset as ftsubset, ttLib
+from fpdf import FPDF
+
+FONT_DIR = "fonts"
+FONT_CACHE_DIR = os.getenv("FONT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ai-sahayak-fonts"))
+
+# Latin, punctuation, currency (₹), arrows, bullets and common symbols
+SUMMARY_UNICODE_RANGES = [
+    (0x0009, 0x000A), (0x0020, 0x024F), (0x2000, 0x206F), (0x20A0, 0x20CF), (0x2100, 0x214F),
+    (0x2190, 0x21FF), (0x2500, 0x25FF), (0x2600, 0x27BF),
+]
+
+# family -> (file in FONT_DIR, Unicode ranges to pre-subset to, or None to use the font as is)
+FONTS = {
+    "Unicode": ("DejaVuSans.ttf", SUMMARY_UNICODE_RANGES),
+    "Telugu": ("NotoSansTelugu-Regular.ttf", None),
+}
+
+SUMMARY_TEMPLATE = {
+    "title": "AI-Sahayak: Scheme Summary",
+    "sections": [
+        {"field": "summary_en", "font": "Unicode", "heading": "English Summary"},
+        {
+            "field": "summary_te", "font": "Telugu", "heading": "తెలుగు సారాంశం (Telugu Summary)",
+            "missing_font_heading": "Telugu Summary (Font Not Found)",
+            "missing_font_note": "Telugu font (NotoSansTelugu-Regular.ttf) not found in /fonts directory. Displaying plain text.",
+        },
+    ],
+}
+
+class _PreparedFont:
+    """A font file plus, when available, a reduced copy and the code points that copy covers."""
+
+    def __init__(self, family: str, path: str, ranges):
+        self.family = family
+        self.path = path
+        self.fast_path = None
+        self.coverage = frozenset()
+        if ranges:
+            try:
+                self.fast_path = _subset_font_file(path, ranges)
+                self.coverage = frozenset(ttLib.TTFont(self.fast_path, lazy=True).getBestCmap())
+            except Exception as e:
+                print(f"WARNING: Could not pre-subset {path}, using the full font: {e}")
+                self.fast_path = None
+
+    def path_for(self, text: str) -> str:
+        if self.fast_path and all(ord(char) in self.coverage for char in set(text)):
+            return self.fast_path
+        return self.path
+
+def _subset_font_file(path: str, ranges) -> str:
+    """Writes (once) a copy of the font keeping only `ranges`; returns its path."""
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read() + repr(ranges).encode()).hexdigest()[:16]
+    os.makedirs(FONT_CACHE_DIR, exist_ok=True)
+    target = os.path.join(FONT_CACHE_DIR, f"{os.path.splitext(os.path.basename(path))[0]}-{digest}.ttf")
+    if os.path.exists(target):
+        return target
+
+    font = ttLib.TTFont(path, recalcTimestamp=False)
+    options = ftsubset.Options(notdef_outline=True, recommended_glyphs=True, name_IDs=["*"], hinting=True)
+    options.drop_tables += ["FFTM"]
+    subsetter = ftsubset.Subsetter(options)
+    subsetter.populate(unicodes=[code for first, last in ranges for code in range(first, last + 1)])
+    subsetter.subset(font)
+    # Write under a temporary name first so concurrent processes never read a partial file
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    font.save(tmp_path)
+    os.replace(tmp_path, target)
+    return target
+
+class _SummaryPDF(FPDF):
+    def __init__(self, title: str):
+        super().__init__()
+        self.title_text = title
+
+    def header(self):
+        self.set_font('Unicode', '', 18)
+        self.cell(0, 10, self.title_text, 0, 1, 'C')
+        self.ln(10)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font('Unicode', '', 8)
+        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
+
+class SummaryRenderer:
+    """
+    Renders summary PDFs from a template. Fonts are prepared once when the
+    renderer is created; keep one renderer per process (see get_renderer).
+    """
+
+    def __init__(self, font_dir: str = FONT_DIR, template: dict = SUMMARY_TEMPLATE):
+        self.template = template
+        self.fonts = {}
+        for family, (filename, ranges) in FONTS.items():
+            path = os.path.join(font_dir, filename)
+            if os.path.exists(path):
+                self.fonts[family] = _PreparedFont(family, path, ranges)
+            else:
+                print(f"WARNING: {filename} not found at {path}. PDF may not render correctly.")
+
+    def render(self, **fields) -> bytes:
+        """Renders one PDF; `fields` fill the template sections (summary_en=..., summary_te=...)."""
+        pdf = _SummaryPDF(self.template["title"])
+        # Each font is registered in its reduced form unless its text needs glyphs outside it
+        text_by_family = {family: "" for family in self.fonts}
+        text_by_family["Unicode"] = self.template["title"]
+        for section in self.template["sections"]:
+            family = section["font"] if section["font"] in self.fonts else "Unicode"
+            text_by_family[family] += "".join(section.values()) + fields.get(section["field"], "")
+        # Fonts must be registered before add_page(), which draws the header
+        for family, font in self.fonts.items():
+            pdf.add_font(family, '', font.path_for(text_by_family[family]))
+
+        pdf.add_page()
+        pdf.set_auto_page_break(auto=True, margin=15)
+        for section in self.template["sections"]:
+            self._render_section(pdf, section, fields.get(section["field"], ""))
+        return bytes(pdf.output())
+
+    def render_batch(self, summaries):
+        """Renders many PDFs with the same prepared fonts; yields one PDF (bytes) per dict of fields."""
+        for fields in summaries:
+            yield self.render(**fields)
+
+    def _render_section(self, pdf: FPDF, section: dict, text: str):
+        if section["font"] in self.fonts:
+            pdf.set_font(section["font"], '', 14)
+            pdf.cell(0, 10, section["heading"], 0, 1, 'L')
+            pdf.set_font(section["font"], '', 11)
+            pdf.multi_cell(0, 8, text, new_x="LMARGIN", new_y="NEXT")
+        else:
+            pdf.set_font('Unicode', '', 12)
+            pdf.cell(0, 10, section.get("missing_font_heading", section["heading"]), 0, 1, 'L')
+            pdf.set_font('Unicode', '', 11)
+            if section.get("missing_font_note"):
+                pdf.multi_cell(0, 8, section["missing_font_note"], new_x="LMARGIN", new_y="NEXT")
+            pdf.multi_cell(0, 8, text, new_x="LMARGIN", new_y="NEXT")
+        pdf.ln(10)
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+def get_renderer() -> SummaryRenderer:
+    """Returns the process-wide renderer, preparing its fonts on first use."""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = SummaryRenderer()
+    return _renderer
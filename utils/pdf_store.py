@@ -0,0 +1,117 @@
+# utils/pdf_store.py
+"""
+Content-addressed storage for summary PDFs in the shared directory.
+
+A summary PDF is named after the hash of the summaries it contains, so
+regenerating the same summary reuses one file. File access times serve
+as the LRU clock: rendering, serving or reusing a PDF from a cache hit
+touches it. Modification times stay put, so the ETag of a served PDF
+does not change.
+
+The garbage collector deletes PDFs that no scheme_cache row references
+any more, then evicts the least recently used PDFs until the directory
+fits its quota. An evicted PDF that is still referenced is re-rendered on
+its next cache hit, under the same name.
+
+Usage:
+    python -m utils.pdf_store [--shared-dir shared] [--quota-mb 500] [--dry-run]
+"""
+
+import argparse
+import glob
+import hashlib
+import os
+import time
+from utils.logger import logger
+
+SHARED_PDF_QUOTA_MB = float(os.getenv("SHARED_PDF_QUOTA_MB", "500"))
+# Unreferenced PDFs younger than this are kept: a new PDF is written before its cache row
+PDF_GC_GRACE_SECONDS = float(os.getenv("PDF_GC_GRACE_SECONDS", "3600"))
+
+def summary_pdf_path(summary_en: str, summary_te: str, shared_dir: str) -> str:
+    """The content-addressed path of the PDF for these summaries."""
+    digest = hashlib.sha256(f"{summary_en}\0{summary_te}".encode()).hexdigest()[:32]
+    return os.path.join(shared_dir, f"summary-{digest}.pdf")
+
+def touch(path: str):
+    """Marks a stored PDF as recently used (sets its access time, keeping the modification time)."""
+    try:
+        os.utime(path, (time.time(), os.stat(path).st_mtime))
+    except OSError:
+        pass
+
+def write_atomic(path: str, data: bytes):
+    """Writes a file under a temporary name and renames it, so readers never see a partial PDF."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def gc_shared_pdfs(shared_dir: str, referenced: set[str] | None = None,
+                   quota_bytes: float = SHARED_PDF_QUOTA_MB * 1024 * 1024,
+                   grace_seconds: float = PDF_GC_GRACE_SECONDS, dry_run: bool = False) -> dict:
+    """
+    Removes unreferenced summary PDFs, then evicts least recently used ones beyond `quota_bytes`.
+    `referenced` defaults to the pdf_path values in scheme_cache.
+    Returns counts and sizes: unreferenced, evicted, kept, bytes_before, bytes_after.
+    """
+    if referenced is None:
+        from utils.db_cache import get_referenced_pdf_paths
+        referenced = get_referenced_pdf_paths()
+    referenced = {os.path.realpath(path) for path in referenced}
+
+    files = []
+    for path in glob.glob(os.path.join(shared_dir, "summary-*.pdf")):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files.append((stat.st_atime, stat.st_mtime, stat.st_size, path))
+    report = {"unreferenced": 0, "evicted": 0, "kept": 0,
+              "bytes_before": sum(size for _, _, size, _ in files), "bytes_after": 0}
+
+    now = time.time()
+    kept = []
+    for atime, mtime, size, path in files:
+        if os.path.realpath(path) not in referenced and now - mtime > grace_seconds:
+            report["unreferenced"] += 1
+            _remove(path, dry_run)
+        else:
+            kept.append((atime, size, path))
+
+    total = sum(size for _, size, _ in kept)
+    kept.sort()  # Oldest use first
+    while kept and total > quota_bytes:
+        atime, size, path = kept.pop(0)
+        report["evicted"] += 1
+        total -= size
+        _remove(path, dry_run)
+
+    report["kept"] = len(kept)
+    report["bytes_after"] = total
+    logger.info(f"PDF store GC{' (dry run)' if dry_run else ''}: removed {report['unreferenced']} unreferenced and {report['evicted']} "
+                f"least recently used PDFs; {report['kept']} kept ({total // 1024} KiB).")
+    return report
+
+def _remove(path: str, dry_run: bool):
+    if dry_run:
+        return
+    try:
+        os.remove(path)
+    except OSError as e:
+        logger.error(f"Could not remove {path}: {e}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Garbage-collect summary PDFs in the shared directory.")
+    parser.add_argument("--shared-dir", default=os.getenv("SHARED_DIR", "shared"))
+    parser.add_argument("--quota-mb", type=float, default=SHARED_PDF_QUOTA_MB, help="Disk quota for summary PDFs")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be removed without deleting")
+    args = parser.parse_args()
+
+    report = gc_shared_pdfs(args.shared_dir, quota_bytes=args.quota_mb * 1024 * 1024, dry_run=args.dry_run)
+    print(f"{'Would remove' if args.dry_run else 'Removed'} {report['unreferenced']} unreferenced and "
+          f"{report['evicted']} least recently used PDFs; {report['kept']} kept, "
+          f"{report['bytes_before'] // 1024} KiB -> {report['bytes_after'] // 1024} KiB")
+
+if __name__ == "__main__":
+    main()
@@ -1,99 +1,238 @@
 # utils/pdf_utils.py
 
-import PyPDF2
-from fpdf import FPDF
 import hashlib
-import datetime
 import os
-from io import BytesIO
+import tempfile
+import itertools
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.cache_metrics import get_metrics
+from utils.db_cache import get_pdf_pages, save_pdf_pages
+from utils.lru_cache import ByteLRUCache
+from utils.pdf_backends import get_backend, get_backends
+from utils.pdf_renderer import get_renderer
+from utils.pdf_store import summary_pdf_path, touch, write_atomic
+
+# Documents with fewer pages than this are extracted in-process; 0 uses each backend's parallel_min_pages
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "0"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+# Pages extracted (and saved to the page cache) per step when streaming
+PDF_STREAM_BATCH_PAGES = int(os.getenv("PDF_STREAM_BATCH_PAGES", "8"))
+# Memory for extracted page text kept in-process, shared by all sessions
+PDF_TEXT_MEMORY_CACHE_MB = int(os.getenv("PDF_TEXT_MEMORY_CACHE_MB", "64"))
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+_page_text_cache = ByteLRUCache(PDF_TEXT_MEMORY_CACHE_MB * 1024 * 1024)
+get_metrics("pdf_page_cache").memory_tier = _page_text_cache
 
 def extract_text_from_pdf(uploaded_file) -> str:
     """Extracts text from an uploaded PDF file."""
     try:
-        pdf_reader = PyPDF2.PdfReader(uploaded_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() or ""
-        return text
+        return "".join(extract_pdf_pages(uploaded_file))
     except Exception as e:
         print(f"Error reading PDF file: {e}")
         return "Error: Could not read the PDF file. It might be corrupted or password-protected."
 
+def extract_pdf_pages(uploaded_file) -> list[str]:
+    """
+    Returns the text of every page, in page order.
+    Results are cached by the file's content hash, in memory and in the database,
+    so Streamlit reruns and re-uploads of the same file skip parsing; only pages
+    missing from both tiers are extracted.
+    """
+    data = _read_pdf_bytes(uploaded_file)
+    content_hash = hashlib.sha256(data).hexdigest()
+    pages = _page_text_cache.get(content_hash)
+    if pages is not None:
+        return pages
+
+    page_count, known = get_pdf_pages(content_hash) or (None, {})
+    if page_count is None or len(known) < page_count:
+        page_count, extracted = _extract_missing_pages(data, known)
+        save_pdf_pages(content_hash, page_count, extracted)
+        known.update(extracted)
+
+    pages = [known[i] for i in range(page_count)]
+    _page_text_cache.put(content_hash, pages)
+    return pages
+
+def _read_pdf_bytes(uploaded_file) -> bytes:
+    """Returns the whole file content of an upload, a path or a file-like object."""
+    if isinstance(uploaded_file, (bytes, bytearray)):
+        return bytes(uploaded_file)
+    if isinstance(uploaded_file, str):
+        with open(uploaded_file, "rb") as f:
+            return f.read()
+    if hasattr(uploaded_file, "getvalue"):
+        return uploaded_file.getvalue()
+    uploaded_file.seek(0)
+    return uploaded_file.read()
+
+def iter_pdf_pages(uploaded_file, batch_pages: int = PDF_STREAM_BATCH_PAGES):
+    """
+    Yields the text of each page in page order as it is extracted, so callers can
+    start on the first pages before the last one is parsed. Only one batch of
+    pages is held at a time; each batch is saved to the page cache as it completes,
+    so a stream that is abandoned part-way still leaves its pages cached.
+    Raises like extract_pdf_pages if the PDF cannot be read.
+    """
+    data = _read_pdf_bytes(uploaded_file)
+    content_hash = hashlib.sha256(data).hexdigest()
+    pages = _page_text_cache.get(content_hash)
+    if pages is not None:
+        yield from pages
+        return
+
+    page_count = None
+    for start in itertools.count(0, batch_pages):
+        cached_count, known = get_pdf_pages(content_hash, start, start + batch_pages) or (None, {})
+        page_count = page_count or cached_count or _with_backends(lambda backend: backend.page_count(data))
+        if start >= page_count:
+            return
+        batch = range(start, min(start + batch_pages, page_count))
+        missing = [i for i in batch if i not in known]
+        if missing:
+            extracted = _with_backends(lambda backend: _extract_pages(backend.name, data, missing))
+            save_pdf_pages(content_hash, page_count, extracted)
+            known.update(extracted)
+        for i in batch:
+            yield known[i]
+
+def pdf_page_count(uploaded_file) -> int:
+    """Number of pages in the PDF, from the page cache when known; raises if the PDF cannot be read."""
+    data = _read_pdf_bytes(uploaded_file)
+    content_hash = hashlib.sha256(data).hexdigest()
+    pages = _page_text_cache.get(content_hash)
+    if pages is not None:
+        return len(pages)
+    cached_count, _ = get_pdf_pages(content_hash, 0, 1) or (None, {})
+    return cached_count or _with_backends(lambda backend: backend.page_count(data))
+
+def pdf_text_prefix(uploaded_file, length: int) -> str:
+    """The first `length` characters of the PDF's text, extracting only the pages they span."""
+    text = ""
+    for page in iter_pdf_pages(uploaded_file):
+        text += page
+        if len(text) >= length:
+            break
+    return text[:length]
+
+def _extract_missing_pages(data: bytes, known: dict[int, str]) -> tuple[int, dict[int, str]]:
+    """Extracts the pages not in `known`. Returns (page_count, {page_no: text})."""
+    page_count = _with_backends(lambda backend: backend.page_count(data))
+    missing = [i for i in range(page_count) if i not in known]
+    return page_count, _with_backends(lambda backend: _extract_pages(backend.name, data, missing))
+
+def _with_backends(action):
+    """
+    Runs `action(backend)` with each configured backend in turn (see
+    utils/pdf_backends.py) and returns the first result that does not raise.
+    """
+    error = None
+    for backend in get_backends():
+        try:
+            return action(backend)
+        except Exception as e:
+            print(f"PDF backend {backend.name} failed: {e}")
+            error = e
+    raise error or RuntimeError("No PDF backend available")
+
+def _extract_pages(backend_name: str, data: bytes, page_numbers: list[int]) -> dict[int, str]:
+    """Extracts the given pages, across the process pool when there are enough of them."""
+    min_pages = PDF_PARALLEL_MIN_PAGES or get_backend(backend_name).parallel_min_pages
+    if len(page_numbers) >= min_pages and PDF_WORKERS > 1:
+        try:
+            return _extract_pages_parallel(backend_name, data, page_numbers)
+        except BrokenProcessPool as e:
+            # A worker died; the pool is unusable, so the next extraction starts fresh workers
+            print(f"PDF worker pool broke, continuing serially: {e}")
+            _reset_pdf_pool()
+        except Exception as e:
+            # An error in this document; the pool stays up for other sessions
+            print(f"Parallel PDF extraction failed, continuing serially: {e}")
+    return dict(zip(page_numbers, get_backend(backend_name).extract_pages(data, page_numbers)))
+
+def _extract_page_batch(backend_name: str, path: str, page_numbers: list[int]) -> list[str]:
+    """Worker task: extracts the given pages of the PDF at `path`."""
+    return get_backend(backend_name).extract_pages(path, page_numbers)
+
+def _split_pages(page_numbers: list[int], workers: int) -> list[list[int]]:
+    """Splits pages into about two consecutive batches per worker, so a slow batch does not hold up the rest."""
+    size = max(1, -(-len(page_numbers) // (workers * 2)))
+    return [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """
+    Returns the process pool for page extraction, created on first use and kept for the process.
+    Page extraction is a plain function in an importable module and its workers
+    start nothing of their own, so a multiprocessing pool fits here; the browser
+    pool (services/browser_pool.py) runs subprocesses in their own sessions
+    because it must kill each worker's whole process group, Chrome included.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # spawn: forking the multi-threaded Streamlit server is unsafe. Workers re-run
+            # __main__ as __mp_main__, and Streamlit's entry point is guarded, so nothing starts twice
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pdf_pool
+
+def _reset_pdf_pool():
+    """Drops the pool so the next parallel extraction starts fresh workers (e.g. after one crashed)."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(wait=False, cancel_futures=True)
+            _pdf_pool = None
+
+def _extract_pages_parallel(backend_name: str, data: bytes, page_numbers: list[int]) -> dict[int, str]:
+    """Extracts page batches across the process pool."""
+    # Workers read the PDF from a temporary file rather than receiving a copy of it per task
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(data)
+    try:
+        pool = _get_pdf_pool()
+        batches = _split_pages(page_numbers, PDF_WORKERS)
+        futures = [pool.submit(_extract_page_batch, backend_name, tmp.name, batch) for batch in batches]
+        pages = {}
+        for batch, future in zip(batches, futures):
+            pages.update(zip(batch, future.result()))
+        return pages
+    finally:
+        os.remove(tmp.name)
+
 def create_summary_pdf(summary_en: str, summary_te: str, shared_dir: str) -> str:
     """
     Generates a PDF with English and Telugu summaries using Unicode fonts.
     Returns the path to the saved PDF.
     """
+    return create_summary_pdfs([(summary_en, summary_te)], shared_dir)[0]
+
+def create_summary_pdfs(summaries: list[tuple[str, str]], shared_dir: str) -> list[str | None]:
+    """
+    Batch version of create_summary_pdf for exports: renders every (summary_en, summary_te)
+    pair with one set of prepared fonts. Returns one path per pair, None where rendering failed.
+    """
     # Ensure the shared directory exists
     os.makedirs(shared_dir, exist_ok=True)
-    
-    # Create a unique filename
-    content_hash = hashlib.sha256((summary_en + summary_te).encode()).hexdigest()[:16]
-    timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
-    filename = f"summary-{content_hash}-{timestamp}.pdf"
-    filepath = os.path.join(shared_dir, filename)
-
-    # --- PDF Generation ---
-    class PDF(FPDF):
-        def header(self):
-            # This will now work because the font is already registered
-            self.set_font('Unicode', '', 18) 
-            self.cell(0, 10, 'AI-Sahayak: Scheme Summary', 0, 1, 'C')
-            self.ln(10)
-
-        def footer(self):
-            self.set_y(-15)
-            self.set_font('Unicode', '', 8)
-            self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
-
-    pdf = PDF()
-
-    # --- REGISTER FONTS IMMEDIATELY ---
-    # This is the crucial fix. Fonts must be added before add_page() is called.
-    
-    # English Unicode Font
-    unicode_font_path = os.path.join("fonts", "DejaVuSans.ttf")
-    if os.path.exists(unicode_font_path):
-        pdf.add_font('Unicode', '', unicode_font_path, uni=True)
-    else:
-        print(f"WARNING: DejaVuSans.ttf not found at {unicode_font_path}. PDF may not render correctly.")
-
-    # Telugu Unicode Font
-    telugu_font_path = os.path.join("fonts", "NotoSansTelugu-Regular.ttf")
-    if os.path.exists(telugu_font_path):
-        pdf.add_font('Telugu', '', telugu_font_path, uni=True)
-    else:
-        print(f"WARNING: NotoSansTelugu-Regular.ttf not found at {telugu_font_path}. PDF may not render correctly.")
-
-    # Now that fonts are registered, we can add the page.
-    # The header() and footer() methods will be able to find the 'Unicode' font.
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=15)
-
-    # Add English section
-    pdf.set_font('Unicode', '', 14)
-    pdf.cell(0, 10, 'English Summary', 0, 1, 'L')
-    pdf.set_font('Unicode', '', 11)
-    pdf.multi_cell(0, 8, summary_en)
-    pdf.ln(10)
-
-    # Add Telugu section
-    if os.path.exists(telugu_font_path):
-        pdf.set_font('Telugu', '', 14)
-        pdf.cell(0, 10, 'తెలుగు సారాంశం (Telugu Summary)', 0, 1, 'L')
-        pdf.set_font('Telugu', '', 11)
-        pdf.multi_cell(0, 8, summary_te)
-    else:
-        # Fallback for Telugu if font is missing
-        pdf.set_font('Unicode', '', 12)
-        pdf.cell(0, 10, 'Telugu Summary (Font Not Found)', 0, 1, 'L')
-        pdf.set_font('Unicode', '', 11)
-        pdf.multi_cell(0, 8, "Telugu font (NotoSansTelugu-Regular.ttf) not found in /fonts directory. Displaying plain text.")
-        pdf.multi_cell(0, 8, summary_te)
+    renderer = get_renderer()
 
-    try:
-        pdf.output(filepath)
-        return filepath
-    except Exception as e:
-        print(f"Error generating PDF: {e}")
-        return None
\ No newline at end of file
+    paths = []
+    for summary_en, summary_te in summaries:
+        # Content-addressed: the same summaries always map to the same file
+        filepath = summary_pdf_path(summary_en, summary_te, shared_dir)
+        if os.path.exists(filepath):
+            touch(filepath)
+            paths.append(filepath)
+            continue
+        try:
+            write_atomic(filepath, renderer.render(summary_en=summary_en, summary_te=summary_te))
+            paths.append(filepath)
+        except Exception as e:
+            print(f"Error generating PDF: {e}")
+            paths.append(None)
+    return paths
@@ -0,0 +1,114 @@
+# utils/search_index.py
+"""
+Full-text index (SQLite FTS5) over cached summaries and extracted page text,
+so users can find schemes analyzed before instead of running the pipeline again.
+
+The index is contentless: payloads stay compressed in scheme_cache and
+url_cache, and search_docs maps each index rowid to the row it came from
+(kind "summary" -> scheme_cache.source_key, kind "url" -> url_cache.url).
+A contentless index can only drop a document given the exact text it indexed,
+so callers pass the old values when a row is replaced or expired.
+
+The functions here work on a cursor, inside the caller's transaction;
+utils/db_cache.py keeps the index in sync and exposes search_cache().
+"""
+
+import re
+import sqlite3
+from utils.logger import logger
+
+# Matches rank higher in summaries than in raw page text
+RANK_WEIGHTS = (2.0, 2.0, 1.0)  # summary_en, summary_te, text
+# Marks (M*) count as word characters: unicode61 would otherwise split Telugu words at every vowel sign
+TOKENIZE = "unicode61 remove_diacritics 2 categories 'L* N* Co M*'"
+
+def drop_outdated(cursor) -> bool:
+    """Drops an index built with another tokenizer, so the caller rebuilds it; returns True if dropped."""
+    row = cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'search_index'").fetchone()
+    if not row or TOKENIZE.replace("'", "''") in row[0]:
+        return False
+    cursor.execute("DROP TABLE search_index")
+    cursor.execute("DROP TABLE IF EXISTS search_docs")
+    return True
+
+def create_schema(cursor) -> bool:
+    """Creates the index tables; returns False if this SQLite build lacks FTS5."""
+    try:
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                summary_en, summary_te, text, content='', tokenize='{TOKENIZE.replace("'", "''")}', prefix='3'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Full-text search disabled, FTS5 is not available: {e}")
+        return False
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_docs (
+            doc_id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            UNIQUE (kind, key)
+        )
+    ''')
+    return True
+
+def index_document(cursor, kind: str, key: str, summary_en: str = "", summary_te: str = "", text: str = ""):
+    """
+    Adds a row to the index. If (kind, key) is still indexed, its old text is
+    unknown here, so the stale doc is unmapped (search joins on search_docs and
+    never returns it) and the new one gets a rowid above every indexed rowid.
+    """
+    cursor.execute("DELETE FROM search_docs WHERE kind = ? AND key = ?", (kind, key))
+    if cursor.rowcount:
+        logger.warning(f"Search index entry for {kind} {key[:80]} was not removed before reindexing; replacing it.")
+    doc_id = (cursor.execute("SELECT rowid FROM search_index ORDER BY rowid DESC LIMIT 1").fetchone() or (0,))[0] + 1
+    cursor.execute("INSERT INTO search_docs (doc_id, kind, key) VALUES (?, ?, ?)", (doc_id, kind, key))
+    cursor.execute(
+        "INSERT INTO search_index (rowid, summary_en, summary_te, text) VALUES (?, ?, ?, ?)",
+        (doc_id, summary_en or "", summary_te or "", text or ""),
+    )
+
+def unindex_document(cursor, kind: str, key: str, summary_en: str = "", summary_te: str = "", text: str = ""):
+    """Removes a row from the index, given the values it was indexed with."""
+    row = cursor.execute("SELECT doc_id FROM search_docs WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+    if not row:
+        return
+    cursor.execute(
+        "INSERT INTO search_index (search_index, rowid, summary_en, summary_te, text) VALUES ('delete', ?, ?, ?, ?)",
+        (row[0], summary_en or "", summary_te or "", text or ""),
+    )
+    cursor.execute("DELETE FROM search_docs WHERE doc_id = ?", (row[0],))
+
+def to_match_query(query: str) -> str | None:
+    """
+    Turns user input into an FTS5 query: every word must match, the last one
+    as a prefix (so results appear while typing). None if nothing is searchable.
+    """
+    terms = [term.replace('"', '') for term in query.split()]
+    terms = [term for term in terms if any(char.isalnum() or ord(char) > 127 for char in term)]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+def search(cursor, query: str, limit: int = 10) -> list[tuple[str, str, float]]:
+    """Returns (kind, key, score) for the best matches, best first (bm25; lower is better)."""
+    match = to_match_query(query)
+    if match is None:
+        return []
+    return cursor.execute(f'''
+        SELECT d.kind, d.key, bm25(search_index, {", ".join(map(str, RANK_WEIGHTS))}) AS score
+        FROM search_index JOIN search_docs d ON d.doc_id = search_index.rowid
+        WHERE search_index MATCH ?
+        ORDER BY score
+        LIMIT ?
+    ''', (match, limit)).fetchall()
+
+def make_snippet(text: str, query: str, width: int = 200) -> str:
+    """The part of `text` around the first occurrence of a query word."""
+    text = re.sub(r"\s+", " ", text or "").strip()
+    lowered = text.lower()
+    positions = [lowered.find(term.lower()) for term in query.split()]
+    positions = [pos for pos in positions if pos >= 0]
+    start = max(min(positions) - width // 4, 0) if positions else 0
+    snippet = text[start:start + width]
+    return ("…" if start > 0 else "") + snippet + ("…" if start + width < len(text) else "")
@@ -17,3 +17,24 @@ def chunk_text_simple(text: str, max_chunk_size: int = 2500, overlap: int = 200)
             break
         start = end - overlap
     return chunks
+
+def chunk_text_stream(pieces, max_chunk_size: int = 2500, overlap: int = 200):
+    """
+    Generator version of chunk_text_simple over text that arrives in pieces (e.g. PDF pages).
+    Yields the same chunks as chunk_text_simple("".join(pieces)) while holding at most one
+    chunk plus one piece in memory, so the first chunks are ready before the last piece is read.
+    """
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        while len(buffer) > max_chunk_size:
+            yield buffer[:max_chunk_size]
+            buffer = buffer[max_chunk_size - overlap:]
+    yield buffer
+
+def estimate_chunk_count(text_length: int, max_chunk_size: int = 2500, overlap: int = 200) -> int:
+    """Number of chunks chunk_text_simple / chunk_text_stream produce for text of this length."""
+    if text_length <= max_chunk_size:
+        return 1
+    step = max_chunk_size - overlap
+    return -(-(text_length - overlap) // step)
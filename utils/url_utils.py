@@ -0,0 +1,45 @@
+# utils/url_utils.py
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track where a click came from; they never change the page
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "_ga", "_gl", "igshid", "yclid"}
+
+def canonicalize_url(url: str) -> str:
+    """
+    Maps the different spellings of one page to a single cache key:
+    - a missing scheme and http:// both become https://
+    - the host is lower-cased (IPv6 literals keep their brackets) and default ports are dropped
+    - user info (user:password@) is kept exactly as given, so different credentials never share an entry
+    - an empty path becomes "/"
+    - utm_* and other tracking parameters are removed, the rest are sorted
+    - the #fragment is removed
+    Only used for cache keys; pages are still fetched with the URL the user gave.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+
+    host = (parts.hostname or "").lower().rstrip(".")
+    if ":" in host:
+        host = f"[{host}]"
+    port = parts.port
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+    userinfo, at, _ = parts.netloc.rpartition("@")
+    if at:
+        netloc = f"{userinfo}@{netloc}"
+
+    path = parts.path or "/"
+
+    params = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ]
+    query = urlencode(sorted(params))
+
+    return urlunsplit((scheme, netloc, path, query, ""))